@@ -8,13 +8,18 @@ import websockets
 from google import genai
 from google.genai import types
 
+try:
+    import uvloop  # optional: faster event loop (not available on Windows)
+except ImportError:
+    uvloop = None
+
 from form_manager import FormManager
 from websocket_handler import (
-    LatencyLogger, SessionConfig, PDFSyncManager, 
+    SessionConfig, PDFSyncManager, 
     measure_latency, setup_session, handle_realtime_input,
     handle_user_edit, handle_form_confirmation
 )
-from audio_handler import get_audio_handler
+from audio_handler import AUDIO_HANDLER, AUDIO_FRAME_TAG, CONTROL_FRAME_TAG
 from tool_response_builder import ToolCall, ToolCallHandler
 from connection_manager import ConnectionManager, SessionContext
 from config import DEFAULT_MODEL
@@ -49,6 +54,16 @@ async def send_to_gemini(client_websocket: websockets.ServerProtocol, session, f
     try:
         async for message in client_websocket:
             try:
+                if isinstance(message, bytes):
+                    # Tagged binary frames from index.html: raw PCM mic audio or UTF-8 JSON control
+                    tag = message[0] if message else None
+                    if tag == AUDIO_FRAME_TAG:
+                        if len(message) > 1:
+                            await AUDIO_HANDLER.stream_handler.send_pcm_to_gemini(session, message[1:])
+                        continue
+                    if tag != CONTROL_FRAME_TAG:
+                        continue
+                    message = message[1:]
                 data = json.loads(message)
                 
                 if "realtime_input" in data:
@@ -91,12 +106,11 @@ async def receive_from_gemini(session, client_websocket: websockets.ServerProtoc
                 if response.server_content is not None:
                     model_turn = response.server_content.model_turn
                     if model_turn:
-                        audio_handler = get_audio_handler()
                         for part in model_turn.parts:
                             if hasattr(part, 'text') and part.text is not None:
                                 await client_websocket.send(json.dumps({"text": part.text}))
                             elif hasattr(part, 'inline_data') and part.inline_data is not None:
-                                await audio_handler.process_gemini_audio_response(client_websocket, part)
+                                await AUDIO_HANDLER.process_gemini_audio_response(client_websocket, part)
                     
                     if response.server_content.turn_complete:
                         pass  # Turn completed
@@ -150,6 +164,7 @@ async def gemini_session_handler(client_websocket: websockets.ServerProtocol):
             return
             
         form_manager = FormManager(pdf_field_names, pdf_form_id)
+        SessionConfig.setup_system_instruction(config, form_manager)
         
         # Setup tool declarations
         config["tools"] = [{"function_declarations": form_manager.get_tool_declarations()}]
@@ -159,14 +174,14 @@ async def gemini_session_handler(client_websocket: websockets.ServerProtocol):
         
         # Connect to Gemini API
         session_context.logger.logger.info(f"Attempting Gemini API connection (client: {client_addr})")
-        gemini_connect_start = time.time()
+        gemini_connect_start = time.monotonic()
         
         async with client.aio.live.connect(model=(model_override or DEFAULT_MODEL), config=config) as session:
-            gemini_connect_time = time.time() - gemini_connect_start
+            gemini_connect_time = time.monotonic() - gemini_connect_start
             print("Connected to Gemini API")
             session_context.logger.log_gemini_connection(client_addr, gemini_connect_time)
             
-            # Setup session with system instructions
+            # Send the priming message (the system instruction goes in the connect config)
             await setup_session(session, form_manager)
             
             # Create send and receive handlers
@@ -197,7 +212,9 @@ async def gemini_session_handler(client_websocket: websockets.ServerProtocol):
 
 async def main() -> None:
     """Start the WebSocket server with connection management."""
-    from config import WEBSOCKET_PING_INTERVAL, WEBSOCKET_PING_TIMEOUT
+    from config import (
+        WEBSOCKET_PING_INTERVAL, WEBSOCKET_PING_TIMEOUT, WEBSOCKET_MAX_SIZE, WEBSOCKET_WRITE_LIMIT
+    )
     
     # Create connection manager
     connection_manager = ConnectionManager()
@@ -218,7 +235,10 @@ async def main() -> None:
             "localhost", 
             9082,
             ping_interval=WEBSOCKET_PING_INTERVAL,
-            ping_timeout=WEBSOCKET_PING_TIMEOUT
+            ping_timeout=WEBSOCKET_PING_TIMEOUT,
+            compression=None,
+            max_size=WEBSOCKET_MAX_SIZE,
+            write_limit=WEBSOCKET_WRITE_LIMIT
         ):
             print("Running WebSocket server on localhost:9082 with connection management...")
             timeout_display = "disabled" if WEBSOCKET_PING_TIMEOUT is None else f"{WEBSOCKET_PING_TIMEOUT}s"
@@ -230,4 +250,7 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
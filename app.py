@@ -8,16 +8,21 @@ execution model is deprecated, but `server.py` still provides shared components.
 `main.py` is kept only for reference. All development should target this entry point.
 """
 import asyncio
-import json
+import logging
 import os
 import signal
 import threading
-import time
 import socketserver
 import websockets
 from google import genai
 
+try:
+    import uvloop  # optional: faster event loop (not available on Windows)
+except ImportError:
+    uvloop = None
+
 # Local imports (reuse existing modules)
+import json_utils
 from form_manager import FormManager
 from websocket_handler import (
     SessionConfig, PDFSyncManager, measure_latency, setup_session,
@@ -25,16 +30,25 @@ from websocket_handler import (
 )
 from tool_response_builder import ToolCall, ToolCallHandler
 from connection_manager import ConnectionManager, SessionContext
-from audio_handler import get_audio_handler
-from config import DEFAULT_MODEL, WEBSOCKET_PING_INTERVAL, WEBSOCKET_PING_TIMEOUT, HTTP_PORT, WEBSOCKET_PORT
+from live_session_pool import LiveSessionPool
+from logging_utils import setup_async_logging, stop_async_logging
+from audio_handler import AUDIO_HANDLER, AUDIO_FRAME_TAG, CONTROL_FRAME_TAG, OutboundAudioBuffer
+from config import (
+    DEFAULT_MODEL, WEBSOCKET_PING_INTERVAL, WEBSOCKET_PING_TIMEOUT, HTTP_PORT, WEBSOCKET_PORT,
+    INBOUND_QUEUE_SIZE, WEBSOCKET_MAX_SIZE, WEBSOCKET_WRITE_LIMIT, WEBSOCKET_COMPRESSION, AUDIO_MIME_TYPE, LOG_LEVEL,
+    LIVE_SESSION_POOL_SIZE, LIVE_SESSION_POOL_MAX_AGE
+)
 
 # Import the HTTP handler & storage/session singletons from existing server module
 import server as legacy_http
 from server import NoCacheHandler  # noqa: F401  (imported for clarity / reuse)
 
+logger = logging.getLogger(__name__)
+
 # Ensure API key wiring (retain previous behavior)
 os.environ['GOOGLE_API_KEY'] = os.getenv('GEMINI_API_KEY')
 client = genai.Client()
+live_pool = LiveSessionPool(client, LIVE_SESSION_POOL_SIZE, LIVE_SESSION_POOL_MAX_AGE)
 
 ###################################################################################################
 # WebSocket (Gemini realtime) logic – largely adapted from previous main.py
@@ -42,57 +56,161 @@ client = genai.Client()
 async def handle_tool_calls(response, form_manager: FormManager, client_websocket: websockets.ServerProtocol, pdf_sync: PDFSyncManager):
     if response.server_content is not None or response.tool_call is None:
         return []
-    all_responses = []
-    for function_call in response.tool_call.function_calls:
-        tool_call = ToolCall(function_call.name, function_call.args, function_call.id)
-        responses = await ToolCallHandler.handle_pdf_form_tools(
-            tool_call, form_manager, client_websocket, pdf_sync
+    # Calls run concurrently; field updates themselves are synchronous, so each call's
+    # state mutation still happens in order before its first await (no lock needed).
+    results = await asyncio.gather(*(
+        ToolCallHandler.handle_pdf_form_tools(
+            ToolCall(function_call.name, function_call.args, function_call.id),
+            form_manager, client_websocket, pdf_sync
         )
-        all_responses.extend(responses)
-    return all_responses
+        for function_call in response.tool_call.function_calls
+    ))
+    return [r for responses in results for r in responses]
+
+async def send_to_gemini(client_websocket: websockets.ServerProtocol, client_writer: SessionContext, session, form_manager: FormManager, pdf_sync: PDFSyncManager, session_closed: asyncio.Event):
+    # Reader parses client frames into a bounded queue; this coroutine forwards them to Gemini.
+    # Audio-only frames are dropped when the queue is full (mic audio tolerates gaps);
+    # control messages wait for room, which pushes backpressure onto the client socket.
+    in_queue: asyncio.Queue = asyncio.Queue(maxsize=INBOUND_QUEUE_SIZE)
+    dropped_frames = 0
 
-async def send_to_gemini(client_websocket: websockets.ServerProtocol, session, form_manager: FormManager, pdf_sync: PDFSyncManager, session_closed: asyncio.Event):
+    async def read_client_messages():
+        nonlocal dropped_frames
+        try:
+            async for message in client_websocket:
+                if isinstance(message, bytes):
+                    tag = message[0] if message else None
+                    if tag == AUDIO_FRAME_TAG:
+                        # Raw PCM mic frame: no JSON or base64 to undo
+                        if len(message) > 1:
+                            try:
+                                in_queue.put_nowait(("audio", message[1:]))
+                            except asyncio.QueueFull:
+                                dropped_frames += 1
+                        continue
+                    if tag != CONTROL_FRAME_TAG:
+                        continue
+                    message = message[1:]
+                try:
+                    data = json_utils.loads(message)
+                    if not isinstance(data, dict):
+                        continue
+                    if "realtime_input" in data:
+                        kind = "realtime_input"
+                    elif "user_edit" in data:
+                        kind = "user_edit"
+                    elif "confirm_form" in data:
+                        kind = "confirm_form"
+                    else:
+                        continue
+                    ri = data["realtime_input"] if kind == "realtime_input" else None
+                except Exception:  # noqa: BLE001
+                    # Ignore malformed client messages
+                    continue
+                if kind == "realtime_input":
+                    if not isinstance(ri, dict):
+                        # Malformed frame: drop it without ending the session
+                        continue
+                    if not ri.get("text") and not ri.get("audio_stream_end"):
+                        # Audio-only: queue the inner dict so the consumer skips re-checking keys
+                        try:
+                            in_queue.put_nowait(("media", ri))
+                        except asyncio.QueueFull:
+                            dropped_frames += 1
+                        continue
+                await in_queue.put((kind, data))
+        except websockets.exceptions.ConnectionClosed:
+            # Connection closed normally
+            pass
+        except Exception:  # noqa: BLE001
+            # Log connection errors silently
+            pass
+        await in_queue.put(None)  # end of client stream
+
+    send_pcm = AUDIO_HANDLER.stream_handler.send_pcm_to_gemini
+    send_media = AUDIO_HANDLER.handle_realtime_audio_input
+    reader_task = asyncio.create_task(read_client_messages())
+    held = []  # at most one item pulled off the queue while coalescing audio
     try:
-        async for message in client_websocket:
+        while True:
+            item = held.pop() if held else await in_queue.get()
+            if item is None:
+                return
+            kind, data = item
             try:
-                data = json.loads(message)
-                if "realtime_input" in data:
+                if kind == "audio":
+                    if not in_queue.empty():
+                        # Mic frames that queued up during the previous send go to Gemini as one blob
+                        frames = [data]
+                        while not in_queue.empty():
+                            item = in_queue.get_nowait()
+                            if item is None or item[0] != "audio":
+                                held.append(item)
+                                break
+                            frames.append(item[1])
+                        data = b"".join(frames)
+                    await send_pcm(session, data)
+                elif kind == "media":
+                    await send_media(session, data)
+                elif kind == "realtime_input":
                     await handle_realtime_input(data, session, form_manager, pdf_sync)
-                elif "user_edit" in data:
+                elif kind == "user_edit":
                     await handle_user_edit(data, session, form_manager, pdf_sync)
-                elif "confirm_form" in data:
-                    await handle_form_confirmation(data, session, form_manager, client_websocket, pdf_sync)
+                elif kind == "confirm_form":
+                    await handle_form_confirmation(data, session, form_manager, client_writer, pdf_sync)
                     return
             except Exception as e:  # noqa: BLE001
                 # Log client message processing errors silently
                 pass
-    except websockets.exceptions.ConnectionClosed:
-        # Connection closed normally
-        pass
-    except Exception as e:  # noqa: BLE001
-        # Log connection errors silently
-        pass
     finally:
+        reader_task.cancel()
+        if dropped_frames:
+            logger.info("Dropped %d mic frames while Gemini was backed up", dropped_frames)
         session_closed.set()
 
-async def receive_from_gemini(session, client_websocket: websockets.ServerProtocol, form_manager: FormManager, pdf_sync: PDFSyncManager, session_closed: asyncio.Event):
+async def forward_model_turn(parts, client_writer: SessionContext, audio_buffer: OutboundAudioBuffer):
+    # Live turns are effectively homogeneous (all audio or all text): pick the loop from the
+    # first part so the common attribute is checked first; each attribute is read once per part.
+    if getattr(parts[0], 'inline_data', None) is not None:
+        # Audio accumulates across server messages; other parts flush it first to keep order
+        for part in parts:
+            inline_data = getattr(part, 'inline_data', None)
+            if inline_data is not None:
+                await audio_buffer.add(inline_data.data, getattr(inline_data, 'mime_type', None) or AUDIO_MIME_TYPE)
+                continue
+            await audio_buffer.flush()
+            text = getattr(part, 'text', None)
+            if text is not None:
+                await client_writer.send(json_utils.dumps({"text": text}))
+    else:
+        await audio_buffer.flush()
+        for part in parts:
+            text = getattr(part, 'text', None)
+            if text is not None:
+                await client_writer.send(json_utils.dumps({"text": text}))
+                continue
+            inline_data = getattr(part, 'inline_data', None)
+            if inline_data is not None:
+                await audio_buffer.add(inline_data.data, getattr(inline_data, 'mime_type', None) or AUDIO_MIME_TYPE)
+
+async def receive_from_gemini(session, client_writer: SessionContext, form_manager: FormManager, pdf_sync: PDFSyncManager, session_closed: asyncio.Event):
+    audio_buffer = OutboundAudioBuffer(client_writer)
     try:
         while True:
             async for response in session.receive():
                 if response.server_content is None and response.tool_call is not None:
-                    function_responses = await handle_tool_calls(response, form_manager, client_websocket, pdf_sync)
+                    await audio_buffer.flush()
+                    function_responses = await handle_tool_calls(response, form_manager, client_writer, pdf_sync)
                     if function_responses:
                         await session.send_tool_response(function_responses=function_responses)
                     continue
-                if response.server_content is not None:
-                    model_turn = response.server_content.model_turn
-                    if model_turn:
-                        audio_handler = get_audio_handler()
-                        for part in model_turn.parts:
-                            if hasattr(part, 'text') and part.text is not None:
-                                await client_websocket.send(json.dumps({"text": part.text}))
-                            elif hasattr(part, 'inline_data') and part.inline_data is not None:
-                                await audio_handler.process_gemini_audio_response(client_websocket, part)
+                server_content = response.server_content
+                if server_content is not None:
+                    model_turn = server_content.model_turn
+                    if model_turn and model_turn.parts:
+                        await forward_model_turn(model_turn.parts, client_writer, audio_buffer)
+                    if server_content.turn_complete or server_content.generation_complete or server_content.interrupted:
+                        await audio_buffer.flush()
     except websockets.exceptions.ConnectionClosedOK:  # type: ignore[attr-defined]
         # Client connection closed normally 
         pass
@@ -103,6 +221,7 @@ async def receive_from_gemini(session, client_websocket: websockets.ServerProtoc
         # Log receive errors silently
         pass
     finally:
+        audio_buffer.close()
         session_closed.set()
 
 async def gemini_session_handler(client_websocket: websockets.ServerProtocol):
@@ -119,34 +238,42 @@ async def gemini_session_handler(client_websocket: websockets.ServerProtocol):
         pdf_form_id = parsed_config["pdf_form_id"]
         voice_name = config.pop("voice_name", None)
         enable_vad = bool(config.pop("enable_vad", False))
-        SessionConfig.setup_voice_config(config, voice_name)
-        SessionConfig.setup_vad_config(config, enable_vad)
+        model = model_override or DEFAULT_MODEL
         if not pdf_field_names or not pdf_form_id:
             await client_websocket.close(code=1011, reason="PDF metadata not provided.")
             return
         form_manager = FormManager(pdf_field_names, pdf_form_id)
-        config["tools"] = [{"function_declarations": form_manager.get_tool_declarations()}]
+        SessionConfig.setup_system_instruction(config, form_manager)
+        # Sessions are interchangeable when model, voice, VAD, instruction and generation settings match
+        pool_key = (model, voice_name, enable_vad, json_utils.dumps(config))
+        SessionConfig.setup_voice_config(config, voice_name)
+        SessionConfig.setup_vad_config(config, enable_vad)
+        SessionConfig.setup_pdf_tools(config)
         pdf_sync = PDFSyncManager(pdf_form_id)
-        start_ts = time.time()
-        async with client.aio.live.connect(model=(model_override or DEFAULT_MODEL), config=config) as session:
+        async with live_pool.session(pool_key, model, config) as session:
             await setup_session(session, form_manager)
+            session_context.start_writer()
             async def send_handler():
-                await send_to_gemini(client_websocket, session, form_manager, pdf_sync, session_context.session_closed)
+                await send_to_gemini(client_websocket, session_context, session, form_manager, pdf_sync, session_context.session_closed)
             async def receive_handler():
-                await receive_from_gemini(session, client_websocket, form_manager, pdf_sync, session_context.session_closed)
-            send_task = asyncio.create_task(send_handler())
-            receive_task = asyncio.create_task(receive_handler())
-            session_context.add_task(send_task)
-            session_context.add_task(receive_task)
-            await session_context.wait_for_completion()
+                await receive_from_gemini(session, session_context, form_manager, pdf_sync, session_context.session_closed)
+            async with asyncio.TaskGroup() as tg:
+                send_task = session_context.add_task(tg.create_task(send_handler()))
+                receive_task = session_context.add_task(tg.create_task(receive_handler()))
+                # TaskGroup only cancels siblings on error; a side that returns normally
+                # (client gone, form confirmed) must also release the Gemini stream
+                send_task.add_done_callback(lambda _t: receive_task.cancel())
+                receive_task.add_done_callback(lambda _t: send_task.cancel())
     except Exception as e:  # noqa: BLE001
         # Log session errors silently
         pass
     finally:
+        # Let queued notifications (final tool response, download_ready) reach the client first
+        await session_context.drain()
         session_context.cancel_tasks()
 
 ###################################################################################################
-# HTTP server thread startup
+# HTTP server startup (aiohttp on the main loop when installed, else a background thread)
 ###################################################################################################
 class ThreadingHTTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
     daemon_threads = True
@@ -166,6 +293,15 @@ def start_http_server():
     except Exception as e:  # noqa: BLE001
         print(f"HTTP server stopped: {e}")
 
+
+async def start_aiohttp_server():
+    """Serve the HTTP endpoints on the running event loop. Returns the runner for cleanup."""
+    runner = legacy_http.web.AppRunner(legacy_http.create_aiohttp_app())
+    await runner.setup()
+    await legacy_http.web.TCPSite(runner, port=HTTP_PORT).start()
+    print(f"HTTP server running on http://localhost:{HTTP_PORT}/index.html")
+    return runner
+
 ###################################################################################################
 # Unified main entry
 ###################################################################################################
@@ -184,6 +320,8 @@ async def run_websocket_server():
         client_addr = f"{ws.remote_address[0]}:{ws.remote_address[1]}"
         await connection_manager.handle_session(ws, client_addr, session_wrapper)
 
+    http_runner = await start_aiohttp_server() if legacy_http.web is not None else None
+
     base = WEBSOCKET_PORT
     chosen_server = None
     chosen_port = None
@@ -195,7 +333,10 @@ async def run_websocket_server():
                 "localhost",
                 port,
                 ping_interval=WEBSOCKET_PING_INTERVAL,
-                ping_timeout=WEBSOCKET_PING_TIMEOUT
+                ping_timeout=WEBSOCKET_PING_TIMEOUT,
+                compression=WEBSOCKET_COMPRESSION,
+                max_size=WEBSOCKET_MAX_SIZE,
+                write_limit=WEBSOCKET_WRITE_LIMIT
             )
             chosen_port = port
             break
@@ -203,6 +344,8 @@ async def run_websocket_server():
             last_error = e
             continue
     if not chosen_server:
+        if http_runner is not None:
+            await http_runner.cleanup()
         raise RuntimeError(f"Failed to bind any WebSocket port in range {base}-{base+9}: {last_error}")
     print(f"WebSocket server running on ws://localhost:{chosen_port} (base requested {base})")
     try:
@@ -213,15 +356,29 @@ async def run_websocket_server():
             await chosen_server.wait_closed()
         except Exception:  # noqa: BLE001
             pass
+        if http_runner is not None:
+            await http_runner.cleanup()
+        await live_pool.close()
 
 
 def main():
-    # Start HTTP server in background thread BEFORE event loop
-    http_thread = threading.Thread(target=start_http_server, name="http-server", daemon=True)
-    http_thread.start()
+    setup_async_logging(LOG_LEVEL)
+    # Keep third-party per-connection / per-request INFO chatter off the console
+    for noisy in ("websockets", "aiohttp.access", "httpx"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+
+    # Without aiohttp, fall back to the threaded HTTP server started BEFORE the event loop
+    if legacy_http.web is None:
+        http_thread = threading.Thread(target=start_http_server, name="http-server", daemon=True)
+        http_thread.start()
 
-    loop = asyncio.new_event_loop()
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
+    if hasattr(asyncio, "eager_task_factory"):  # Python 3.12+
+        # New tasks run synchronously up to their first real suspension instead of
+        # waiting a loop iteration to start
+        loop.set_task_factory(asyncio.eager_task_factory)
+    print(f"Event loop: {'uvloop' if uvloop is not None else 'asyncio (install uvloop for a faster loop)'}")
 
     def shutdown_handler(*_):  # noqa: D401, ANN002
         print("\nShutdown signal received. Stopping services...")
@@ -247,6 +404,7 @@ def main():
     finally:
         loop.close()
         print("Unified server stopped.")
+        stop_async_logging()
 
 if __name__ == "__main__":
     main()
@@ -3,43 +3,101 @@ Audio handling utilities for WebSocket communication.
 Consolidates audio processing logic that was scattered across multiple functions.
 """
 
-import base64
-import json
-from typing import Dict, Any, List, Optional
+import asyncio
+import binascii
+import functools
+import logging
+from typing import Dict, Any, List, Optional, Union
 import websockets
 from google.genai import types
 from config import AUDIO_MIME_TYPE
+import json_utils
+
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+logger = logging.getLogger(__name__)
+
+PCM_MIME_TYPE = "audio/pcm"
+
+# SIMD-accelerated base64 when available; otherwise binascii directly, which is what
+# base64.b64decode/b64encode call after their per-call argument handling
+if pybase64 is not None:
+    def _b64decode(data: str) -> bytes:
+        return pybase64.b64decode(data, validate=False)
+    # Encodes straight to str, skipping the intermediate bytes object
+    _b64encode_str = pybase64.b64encode_as_string
+else:
+    _b64decode = binascii.a2b_base64
+
+    def _b64encode_str(data: bytes) -> str:
+        return binascii.b2a_base64(data, newline=False).decode('ascii')
+
+# Audio response envelope: {"audio": "<b64>", "audio_mime_type": "<mime>"}
+_AUDIO_JSON_PREFIX = '{"audio":"'
+
+# Binary websocket frames carry a 1-byte type tag followed by the payload:
+# raw PCM audio (either direction) or a UTF-8 JSON control message
+AUDIO_FRAME_TAG = 0
+CONTROL_FRAME_TAG = 1
+_AUDIO_FRAME_PREFIX = bytes((AUDIO_FRAME_TAG,))
+
+
+def _blob(data: bytes, mime_type: str) -> types.Blob:
+    """Build a Blob without running pydantic validation (data must already be bytes).
+    
+    The SDK serializes it the same way as a validated Blob; skipping validation
+    matters because the mic path builds one per frame.
+    """
+    return types.Blob.model_construct(data=data, mime_type=mime_type)
+
+
+@functools.lru_cache(maxsize=8)
+def _audio_json_suffix(mime_type: str) -> str:
+    return '","audio_mime_type":' + json_utils.dumps(mime_type) + '}'
 
 
 class AudioChunk:
-    """Represents a single audio chunk with metadata."""
+    """Represents a single audio chunk with metadata.
     
-    def __init__(self, data: bytes, mime_type: str = AUDIO_MIME_TYPE):
+    ``data`` may be any bytes-like object (bytes, bytearray, memoryview) so
+    callers can hand over buffers without copying them first.
+    """
+    
+    __slots__ = ('data', 'mime_type', 'size')
+    
+    def __init__(self, data: Union[bytes, bytearray, memoryview], mime_type: str = AUDIO_MIME_TYPE):
         self.data = data
         self.mime_type = mime_type
-        self.size = len(data)
+        self.size = data.nbytes if isinstance(data, memoryview) else len(data)
     
     @classmethod
     def from_base64(cls, base64_data: str, mime_type: str = AUDIO_MIME_TYPE) -> 'AudioChunk':
-        """Create AudioChunk from base64 encoded data."""
-        try:
-            data = base64.b64decode(base64_data)
-            return cls(data, mime_type)
-        except Exception as e:
-            raise ValueError(f"Invalid base64 audio data: {e}")
+        """Create AudioChunk from base64 encoded data.
+        
+        Raises ValueError (binascii.Error) on malformed input; callers catch it
+        at the batch boundary rather than paying for a handler per chunk.
+        """
+        return cls(_b64decode(base64_data), mime_type)
     
     def to_base64(self) -> str:
         """Convert audio data to base64 string."""
-        return base64.b64encode(self.data).decode('utf-8')
+        return _b64encode_str(self.data)
     
     def to_gemini_blob(self) -> types.Blob:
         """Convert to Gemini API Blob format."""
-        return types.Blob(data=self.data, mime_type=self.mime_type)
+        # Blob wants bytes; normalize bytearray / memoryview before skipping validation
+        data = self.data if isinstance(self.data, bytes) else bytes(self.data)
+        return _blob(data, self.mime_type)
 
 
 class AudioProcessor:
     """Processes audio data for WebSocket communication."""
     
+    __slots__ = ()
+    
     @staticmethod
     def extract_audio_chunks(realtime_input: Dict[str, Any]) -> List[AudioChunk]:
         """
@@ -55,7 +113,7 @@ class AudioProcessor:
         media_chunks = realtime_input.get("media_chunks", [])
         
         for chunk_data in media_chunks:
-            if chunk_data.get("mime_type") == "audio/pcm" and "data" in chunk_data:
+            if chunk_data.get("mime_type") == "audio/pcm" and isinstance(chunk_data.get("data"), str):
                 try:
                     audio_chunk = AudioChunk.from_base64(
                         chunk_data["data"], 
@@ -63,11 +121,63 @@ class AudioProcessor:
                     )
                     chunks.append(audio_chunk)
                 except ValueError as e:
-                    print(f"Failed to process audio chunk: {e}")
+                    logger.debug("Failed to process audio chunk: %s", e)
                     continue
         
         return chunks
     
+    @staticmethod
+    def decode_pcm_runs(realtime_input: Dict[str, Any]) -> List[bytes]:
+        """
+        Decode PCM media chunks, handling runs of adjacent chunks in one pass.
+        
+        Consecutive PCM chunks are joined as base64 text and decoded once.
+        A chunk that is padded (or not a whole number of quanta) closes the
+        run, since padding is only valid at the end of a base64 string.
+        
+        Args:
+            realtime_input: The realtime_input portion of a WebSocket message
+            
+        Returns:
+            List of raw PCM byte strings (one per merged run)
+        """
+        decoded: List[bytes] = []
+        run: List[str] = []
+        
+        def flush():
+            if not run:
+                return
+            try:
+                decoded.append(_b64decode("".join(run)))
+            except ValueError as e:
+                logger.debug("Failed to process audio chunk: Invalid base64 audio data: %s", e)
+            run.clear()
+        
+        append = run.append
+        for chunk_data in realtime_input.get("media_chunks", ()):
+            data = chunk_data.get("data")
+            if chunk_data.get("mime_type") != PCM_MIME_TYPE or not isinstance(data, str):
+                continue
+            append(data)
+            if len(data) % 4 or data.endswith("="):
+                flush()
+        flush()
+        
+        return decoded
+    
+    @staticmethod
+    def extract_audio_chunks_bulk(realtime_input: Dict[str, Any]) -> List[AudioChunk]:
+        """
+        Extract audio chunks, decoding runs of adjacent PCM chunks in one pass.
+        
+        Args:
+            realtime_input: The realtime_input portion of a WebSocket message
+            
+        Returns:
+            List of AudioChunk objects (one per merged run)
+        """
+        return [AudioChunk(data, PCM_MIME_TYPE) for data in AudioProcessor.decode_pcm_runs(realtime_input)]
+    
     @staticmethod
     def create_audio_response(audio_data: bytes, mime_type: str = AUDIO_MIME_TYPE) -> Dict[str, Any]:
         """
@@ -80,16 +190,49 @@ class AudioProcessor:
         Returns:
             Dictionary ready to be sent as JSON over WebSocket
         """
-        base64_audio = base64.b64encode(audio_data).decode('utf-8')
+        base64_audio = _b64encode_str(audio_data)
         return {
             "audio": base64_audio,
             "audio_mime_type": mime_type
         }
+    
+    @staticmethod
+    def create_audio_response_text(audio_data: bytes, mime_type: str = AUDIO_MIME_TYPE) -> str:
+        """
+        Serialize an audio response message without going through json.dumps.
+        
+        Base64 output is ASCII with nothing to escape, so the JSON text is
+        assembled around a fixed prefix and a per-mime-type cached suffix.
+        Produces the same document as json_utils.dumps(create_audio_response(...)).
+        
+        Args:
+            audio_data: Raw audio bytes
+            mime_type: MIME type of the audio
+            
+        Returns:
+            JSON string ready to be sent as a WebSocket text frame
+        """
+        return _AUDIO_JSON_PREFIX + _b64encode_str(audio_data) + _audio_json_suffix(mime_type)
+    
+    @staticmethod
+    def create_audio_response_frame(audio_data: bytes) -> bytes:
+        """
+        Wrap raw PCM audio as a tagged binary frame (no base64, no JSON).
+        
+        Args:
+            audio_data: Raw PCM bytes
+            
+        Returns:
+            Bytes ready to be sent as a WebSocket binary frame
+        """
+        return _AUDIO_FRAME_PREFIX + audio_data
 
 
 class AudioStreamHandler:
     """Handles audio streaming for WebSocket sessions."""
     
+    __slots__ = ('chunks_processed', 'total_bytes_processed', 'last_chunk_time')
+    
     def __init__(self):
         self.chunks_processed = 0
         self.total_bytes_processed = 0
@@ -101,11 +244,16 @@ class AudioStreamHandler:
         
         Args:
             session: Gemini API session
-            audio_chunks: List of audio chunks to send
+            audio_chunks: List of audio chunks to send; chunks sharing a
+                mime_type are merged into a single blob before sending
             
         Returns:
-            Number of chunks successfully sent
+            Number of blobs successfully sent
         """
+        if len(audio_chunks) > 1 and all(c.mime_type == audio_chunks[0].mime_type for c in audio_chunks):
+            # One frame to Gemini instead of one per chunk
+            audio_chunks = [AudioChunk(b"".join(c.data for c in audio_chunks), audio_chunks[0].mime_type)]
+        
         sent_count = 0
         
         for chunk in audio_chunks:
@@ -117,16 +265,47 @@ class AudioStreamHandler:
                 
             except websockets.exceptions.ConnectionClosed as e:
                 if e.code == 1011:
-                    print("Audio send failed: keepalive timeout")
+                    logger.warning("Audio send failed: keepalive timeout")
                 else:
-                    print(f"Audio send failed: connection closed ({e})")
+                    logger.warning("Audio send failed: connection closed (%s)", e)
                 raise
             except Exception as e:
-                print(f"Failed to send audio chunk: {e}")
+                logger.error("Failed to send audio chunk: %s", e)
                 continue
         
         return sent_count
     
+    async def send_pcm_to_gemini(self, session, data: bytes, mime_type: str = PCM_MIME_TYPE) -> bool:
+        """
+        Send already-decoded audio bytes to Gemini as a single blob.
+        
+        Hot-path variant of send_audio_chunks_to_gemini that skips the
+        AudioChunk wrapper.
+        
+        Args:
+            session: Gemini API session
+            data: Raw audio bytes
+            mime_type: MIME type of the audio
+            
+        Returns:
+            True if sent successfully, False otherwise
+        """
+        try:
+            await session.send_realtime_input(media=_blob(data, mime_type))
+        except websockets.exceptions.ConnectionClosed as e:
+            if e.code == 1011:
+                logger.warning("Audio send failed: keepalive timeout")
+            else:
+                logger.warning("Audio send failed: connection closed (%s)", e)
+            raise
+        except Exception as e:
+            logger.error("Failed to send audio chunk: %s", e)
+            return False
+        
+        self.chunks_processed += 1
+        self.total_bytes_processed += len(data)
+        return True
+    
     async def send_audio_response_to_client(self, client_websocket: websockets.ServerProtocol, 
                                           audio_data: bytes, mime_type: str = AUDIO_MIME_TYPE) -> bool:
         """
@@ -141,11 +320,14 @@ class AudioStreamHandler:
             True if sent successfully, False otherwise
         """
         try:
-            response = AudioProcessor.create_audio_response(audio_data, mime_type)
-            await client_websocket.send(json.dumps(response))
+            if mime_type.startswith(PCM_MIME_TYPE):
+                # The client plays binary frames as PCM16; other formats keep the JSON envelope
+                await client_websocket.send(AudioProcessor.create_audio_response_frame(audio_data))
+            else:
+                await client_websocket.send(AudioProcessor.create_audio_response_text(audio_data, mime_type))
             return True
         except Exception as e:
-            print(f"Failed to send audio to client: {e}")
+            logger.error("Failed to send audio to client: %s", e)
             return False
     
     def get_stats(self) -> Dict[str, Any]:
@@ -166,9 +348,72 @@ class AudioStreamHandler:
         self.last_chunk_time = None
 
 
+class OutboundAudioBuffer:
+    """Coalesces model audio parts into fewer, larger client frames.
+    
+    Audio is held until ``max_bytes`` have accumulated, ``max_delay`` seconds
+    have passed since the first buffered byte, the mime type changes, or the
+    caller flushes at a turn boundary. A timer covers the delay bound when
+    Gemini pauses mid-turn, so buffered audio never waits on the next part.
+    """
+    
+    __slots__ = ('client_websocket', 'max_bytes', 'max_delay', '_buf', '_mime', '_started', '_timer', '_flush_task')
+    
+    def __init__(self, client_websocket: websockets.ServerProtocol, max_bytes: int = 4096, max_delay: float = 0.02):
+        self.client_websocket = client_websocket
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self._buf = bytearray()
+        self._mime: Optional[str] = None
+        self._started = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    async def add(self, data: bytes, mime_type: str = AUDIO_MIME_TYPE):
+        """Buffer one audio part, sending the batch once a bound is reached."""
+        if self._buf and mime_type != self._mime:
+            await self.flush()
+        loop = asyncio.get_running_loop()
+        if not self._buf:
+            self._started = loop.time()
+            self._timer = loop.call_later(self.max_delay, self._on_timer)
+        self._mime = mime_type
+        self._buf += data
+        if len(self._buf) >= self.max_bytes or loop.time() - self._started >= self.max_delay:
+            await self.flush()
+    
+    async def flush(self) -> bool:
+        """Send any buffered audio as a single frame."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buf:
+            return True
+        # Detach the batch before awaiting so parts added meanwhile start a new one
+        data = bytes(self._buf)
+        self._buf.clear()
+        return await AUDIO_HANDLER.stream_handler.send_audio_response_to_client(self.client_websocket, data, self._mime)
+    
+    def _on_timer(self):
+        self._timer = None
+        self._flush_task = asyncio.ensure_future(self.flush())
+    
+    def close(self):
+        """Drop buffered audio and cancel any pending timer flush."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        self._buf.clear()
+
+
 class AudioMessageHandler:
     """High-level handler for audio-related WebSocket messages."""
     
+    __slots__ = ('stream_handler', 'processor')
+    
     def __init__(self):
         self.stream_handler = AudioStreamHandler()
         self.processor = AudioProcessor()
@@ -184,13 +429,13 @@ class AudioMessageHandler:
         Returns:
             True if any audio was processed, False otherwise
         """
-        audio_chunks = self.processor.extract_audio_chunks(realtime_input)
+        runs = self.processor.decode_pcm_runs(realtime_input)
         
-        if not audio_chunks:
+        if not runs:
             return False
         
-        sent_count = await self.stream_handler.send_audio_chunks_to_gemini(session, audio_chunks)
-        return sent_count > 0
+        pcm = runs[0] if len(runs) == 1 else b"".join(runs)
+        return await self.stream_handler.send_pcm_to_gemini(session, pcm)
     
     async def handle_text_input(self, session, text: str) -> bool:
         """
@@ -210,7 +455,7 @@ class AudioMessageHandler:
             await session.send_realtime_input(text=text.strip())
             return True
         except Exception as e:
-            print(f"Error sending text to Gemini: {e}")
+            logger.error("Error sending text to Gemini: %s", e)
             return False
     
     async def handle_audio_stream_end(self, session) -> bool:
@@ -227,7 +472,7 @@ class AudioMessageHandler:
             await session.send_realtime_input(audio_stream_end=True)
             return True
         except Exception as e:
-            print(f"audio_stream_end error: {e}")
+            logger.error("audio_stream_end error: %s", e)
             return False
     
     async def process_gemini_audio_response(self, client_websocket: websockets.ServerProtocol, 
@@ -242,13 +487,14 @@ class AudioMessageHandler:
         Returns:
             True if processed successfully, False otherwise
         """
-        if not hasattr(audio_part, 'inline_data') or audio_part.inline_data is None:
+        inline_data = getattr(audio_part, 'inline_data', None)
+        if inline_data is None:
             return False
         
-        mime_type = getattr(audio_part.inline_data, 'mime_type', AUDIO_MIME_TYPE)
+        mime_type = getattr(inline_data, 'mime_type', None) or AUDIO_MIME_TYPE
         success = await self.stream_handler.send_audio_response_to_client(
             client_websocket, 
-            audio_part.inline_data.data, 
+            inline_data.data, 
             mime_type
         )
         
@@ -259,19 +505,16 @@ class AudioMessageHandler:
         return self.stream_handler.get_stats()
 
 
-# Global audio handler instance for convenience
-_audio_handler = None
+@functools.cache
+def get_audio_handler() -> AudioMessageHandler:
+    """Get the global audio handler instance (created once, on first call)."""
+    return AudioMessageHandler()
 
 
-def get_audio_handler() -> AudioMessageHandler:
-    """Get or create the global audio handler instance."""
-    global _audio_handler
-    if _audio_handler is None:
-        _audio_handler = AudioMessageHandler()
-    return _audio_handler
+# Global audio handler instance, bound at import so hot paths can use it directly
+AUDIO_HANDLER = get_audio_handler()
 
 
 def reset_audio_handler():
-    """Reset the global audio handler (useful for testing)."""
-    global _audio_handler
-    _audio_handler = None
\ No newline at end of file
+    """Reset the global audio handler's statistics (useful for testing)."""
+    AUDIO_HANDLER.stream_handler.reset_stats()
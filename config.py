@@ -3,6 +3,8 @@ Configuration settings for the Gemini Real-time Voice Application.
 Consolidates all constants and configuration in one place.
 """
 
+from types import MappingProxyType
+
 # Server Configuration
 HTTP_PORT = 8000
 WEBSOCKET_PORT = 9082
@@ -22,6 +24,16 @@ WEBSOCKET_PING_INTERVAL = 30  # Send keepalive pings every 30 seconds
 # Setting timeout to None disables automatic close on missing pong (helpful when model processing may exceed interval)
 WEBSOCKET_PING_TIMEOUT = None  # None => treat as 'disabled' in logging
 LATENCY_MEASUREMENT_INTERVAL = 30  # Seconds between latency measurements
+WEBSOCKET_MAX_SIZE = 2 ** 20  # Max inbound message size (mic frames are ~1-4 KB)
+WEBSOCKET_WRITE_LIMIT = 2 ** 20  # Outbound buffer high-water mark; lets a TTS burst sit in the buffer instead of awaiting drain between frames
+WEBSOCKET_COMPRESSION = None  # permessage-deflate off: base64 PCM barely compresses and each deflate context holds ~64 KiB
+INBOUND_QUEUE_SIZE = 32  # Max queued client->Gemini messages per session; excess mic frames are dropped
+OUTBOUND_QUEUE_SIZE = 64  # Max queued server->client messages per session before senders wait
+OUTBOUND_DRAIN_TIMEOUT = 1.0  # Seconds teardown waits for queued server->client messages to be sent
+
+# Gemini Live session prewarming (opt-in; 0 disables). Each pooled session holds Gemini session quota while idle.
+LIVE_SESSION_POOL_SIZE = 0  # Unused sessions kept open per recently used voice/VAD/model signature
+LIVE_SESSION_POOL_MAX_AGE = 120  # Seconds before an unused pooled session is closed
 
 # Model Configuration
 DEFAULT_MODEL = "gemini-2.5-flash-preview-native-audio-dialog"
@@ -65,8 +77,8 @@ INTERNAL_FIELD_PATTERNS = [
     "_spc",  # spacer artifacts
 ]
 
-# Tool Declarations
-PDF_TOOL_DECLARATIONS = [
+# Tool Declarations (read-only; shared by every session)
+PDF_TOOL_DECLARATIONS = tuple(MappingProxyType(d) for d in [
     {
         "name": "update_pdf_fields",
         "description": (
@@ -87,12 +99,13 @@ PDF_TOOL_DECLARATIONS = [
         "description": "Retrieve current PDF form progress, counts, and remaining sample. Call if unsure or after unknown_fields.",
         "parameters": {"type": "OBJECT", "properties": {}}
     }
-]
+])
 
 # Logging Configuration
 LOG_FILE_LATENCY = 'websocket_latency.log'
 LOG_FILE_TOOLS = 'tool_calls.log'
 LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_LEVEL = 'INFO'  # Console log level; per-chunk audio errors log at DEBUG
 
 # Error Messages
 ERROR_MESSAGES = {
@@ -114,34 +127,67 @@ ERROR_MESSAGES = {
 
 # Voice Configuration
 DEFAULT_VOICE = "Puck"
-VOICE_OPTIONS = [
-    ("Puck", "Conversational, friendly"),
-    ("Charon", "Deep, authoritative"),
-    ("Kore", "Neutral, professional"),
-    ("Fenrir", "Warm, approachable"),
-    ("Leda", "Youthful"),
-    ("Orus", "Firm"),
-    ("Aoede", "Breezy"),
-    ("Callirrhoe", "Easy-going"),
-    ("Enceladus", "Breathy"),
-    ("Iapetus", "Clear"),
-    ("Umbriel", "Easy-going"),
-    ("Algieba", "Smooth"),
-    ("Despina", "Smooth"),
-    ("Erinome", "Clear"),
-    ("Algenib", "Gravelly"),
-    ("Rasalgethi", "Informative"),
-    ("Laomedeia", "Upbeat"),
-    ("Achernar", "Soft"),
-    ("Alnilam", "Firm"),
-    ("Schedar", "Even"),
-    ("Gacrux", "Mature"),
-    ("Pulcherrima", "Forward"),
-    ("Achird", "Friendly"),
-    ("Zubenelgenubi", "Casual"),
-    ("Vindemiatrix", "Gentle"),
-    ("Sadachbia", "Lively"),
-    ("Sadaltager", "Knowledgeable"),
-    ("Sulafat", "Warm"),
-    ("Zephyr", "Bright"),
-]
\ No newline at end of file
+# Parallel tuples: callers that only need names read VOICE_NAMES directly
+VOICE_NAMES: tuple[str, ...] = (
+    "Puck",
+    "Charon",
+    "Kore",
+    "Fenrir",
+    "Leda",
+    "Orus",
+    "Aoede",
+    "Callirrhoe",
+    "Enceladus",
+    "Iapetus",
+    "Umbriel",
+    "Algieba",
+    "Despina",
+    "Erinome",
+    "Algenib",
+    "Rasalgethi",
+    "Laomedeia",
+    "Achernar",
+    "Alnilam",
+    "Schedar",
+    "Gacrux",
+    "Pulcherrima",
+    "Achird",
+    "Zubenelgenubi",
+    "Vindemiatrix",
+    "Sadachbia",
+    "Sadaltager",
+    "Sulafat",
+    "Zephyr",
+)
+VOICE_DESCRIPTIONS: tuple[str, ...] = (
+    "Conversational, friendly",
+    "Deep, authoritative",
+    "Neutral, professional",
+    "Warm, approachable",
+    "Youthful",
+    "Firm",
+    "Breezy",
+    "Easy-going",
+    "Breathy",
+    "Clear",
+    "Easy-going",
+    "Smooth",
+    "Smooth",
+    "Clear",
+    "Gravelly",
+    "Informative",
+    "Upbeat",
+    "Soft",
+    "Firm",
+    "Even",
+    "Mature",
+    "Forward",
+    "Friendly",
+    "Casual",
+    "Gentle",
+    "Lively",
+    "Knowledgeable",
+    "Warm",
+    "Bright",
+)
+VOICE_OPTIONS = tuple(zip(VOICE_NAMES, VOICE_DESCRIPTIONS))
\ No newline at end of file
@@ -4,10 +4,21 @@ Handles session lifecycle, error handling, and task coordination.
 """
 
 import asyncio
+import logging
 from typing import Optional, Callable, Any
 import websockets
 
 from websocket_handler import LatencyLogger
+from config import (
+    OUTBOUND_QUEUE_SIZE, OUTBOUND_DRAIN_TIMEOUT, WEBSOCKET_MAX_SIZE, WEBSOCKET_WRITE_LIMIT, WEBSOCKET_COMPRESSION,
+    WEBSOCKET_PING_INTERVAL, WEBSOCKET_PING_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+# LatencyLogger holds no per-session state, and each instance attaches another
+# FileHandler to the same named logger, so every session shares one.
+_SHARED_LATENCY_LOGGER = LatencyLogger()
 
 
 class SessionContext:
@@ -17,24 +28,80 @@ class SessionContext:
         self.client_websocket = client_websocket
         self.client_addr = client_addr
         self.session_closed = asyncio.Event()
-        # LatencyLogger now takes no constructor arguments; pass client address in each log call
-        self.logger = LatencyLogger()
-        self._tasks: list[asyncio.Task] = []
+        # Shared instance; pass client address in each log call
+        self.logger = _SHARED_LATENCY_LOGGER
+        self._tasks: set[asyncio.Task] = set()
+        # Outbound client messages are funneled through a single writer task so
+        # producers never wait on the socket drain themselves.
+        self.out_queue: asyncio.Queue = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        self._writer_task: Optional[asyncio.Task] = None
+    
+    async def send(self, message) -> None:
+        """Queue a message for the client (waits only if the queue is full)."""
+        if self._writer_task is None or self._writer_task.done():
+            # No live writer: send inline so connection errors surface to the caller
+            await self.client_websocket.send(message)
+            return
+        try:
+            # Common case: room in the queue, so skip creating and awaiting a put() coroutine
+            self.out_queue.put_nowait(message)
+        except asyncio.QueueFull:
+            await self.out_queue.put(message)
+    
+    def start_writer(self) -> asyncio.Task:
+        """Start the per-connection writer task if not already running."""
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._run_writer())
+        return self._writer_task
     
-    def add_task(self, task: asyncio.Task):
-        """Add a task to be managed by this session context."""
-        self._tasks.append(task)
+    async def _run_writer(self):
+        """Drain the outbound queue, sending any backlog without re-waiting."""
+        queue = self.out_queue
+        send = self.client_websocket.send
+        try:
+            while True:
+                batch = [await queue.get()]
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                for message in batch:
+                    await send(message)
+                    queue.task_done()
+        except websockets.exceptions.ConnectionClosed:
+            self.session_closed.set()
+    
+    async def drain(self, timeout: float = OUTBOUND_DRAIN_TIMEOUT) -> None:
+        """Wait (bounded) for the writer to send everything already queued."""
+        writer = self._writer_task
+        if writer is None or writer.done():
+            return
+        joiner = asyncio.ensure_future(self.out_queue.join())
+        # A writer that dies on a closed socket never finishes the queue; stop waiting then
+        await asyncio.wait((joiner, writer), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        joiner.cancel()
+    
+    def add_task(self, task: asyncio.Task) -> asyncio.Task:
+        """Add a task to be managed by this session context; returns it for chaining."""
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
     
     async def wait_for_completion(self):
         """Wait for all session tasks to complete."""
         if self._tasks:
-            await asyncio.gather(*self._tasks, return_exceptions=True)
+            # Copy: finished tasks discard themselves from the live set
+            done, _ = await asyncio.wait(set(self._tasks))
+            for task in done:
+                # Mark failures as retrieved so asyncio does not log them at GC
+                if not task.cancelled():
+                    task.exception()
     
     def cancel_tasks(self):
         """Cancel all pending tasks."""
-        for task in self._tasks:
-            if not task.done():
-                task.cancel()
+        # Finished tasks evict themselves, so everything left here is pending
+        for task in tuple(self._tasks):
+            task.cancel()
+        if self._writer_task is not None and not self._writer_task.done():
+            self._writer_task.cancel()
     
     def close_session(self):
         """Signal that the session should close."""
@@ -45,7 +112,8 @@ class ConnectionManager:
     """Manages WebSocket connections and session lifecycle."""
     
     def __init__(self):
-        self.active_sessions: dict[str, SessionContext] = {}
+        # Keyed by id(client_websocket); the object is alive for the whole session
+        self.active_sessions: dict[int, SessionContext] = {}
     
     async def handle_session(self, client_websocket: websockets.ServerProtocol, 
                            client_addr: str, session_handler: Callable) -> None:
@@ -58,13 +126,13 @@ class ConnectionManager:
             session_handler: Async function to handle the session business logic
         """
         context = SessionContext(client_websocket, client_addr)
-        session_id = f"{client_addr}_{id(client_websocket)}"
+        session_id = id(client_websocket)
         
         try:
             # Register the active session
             self.active_sessions[session_id] = context
             
-            print(f"New WebSocket connection from {client_addr}")
+            logger.info("New WebSocket connection from %s", client_addr)
             context.logger.log_connection(client_addr)
             
             # Latency monitoring is started inside gemini_session_handler (measure_latency task).
@@ -74,23 +142,23 @@ class ConnectionManager:
             await session_handler(context)
             
         except websockets.exceptions.ConnectionClosedOK:
-            print(f"Client {client_addr} disconnected normally")
+            logger.info("Client %s disconnected normally", client_addr)
         except websockets.exceptions.ConnectionClosed as e:
             if e.code == 1011:
-                print(f"Client {client_addr} connection closed due to keepalive timeout")
+                logger.info("Client %s connection closed due to keepalive timeout", client_addr)
             else:
-                print(f"Client {client_addr} WebSocket connection closed: {e}")
+                logger.info("Client %s WebSocket connection closed: %s", client_addr, e)
         except Exception as e:
-            print(f"Error in session for {client_addr}: {e}")
+            logger.warning("Error in session for %s: %s", client_addr, e)
             context.logger.log_error(client_addr, str(e))
         finally:
             # Clean up session
+            await context.drain()
             context.cancel_tasks()
-            if session_id in self.active_sessions:
-                del self.active_sessions[session_id]
+            self.active_sessions.pop(session_id, None)
             
-            print(f"Session ended for {client_addr}")
-            context.logger.logger.info(f"Session ended (client: {client_addr})")
+            logger.info("Session ended for %s", client_addr)
+            context.logger.logger.info("Session ended (client: %s)", client_addr)
     
     async def create_session_tasks(self, context: SessionContext, 
                                  send_handler: Callable, receive_handler: Callable) -> None:
@@ -102,15 +170,9 @@ class ConnectionManager:
             send_handler: Async function to handle sending messages
             receive_handler: Async function to handle receiving messages
         """
-        # Create send and receive tasks
-        send_task = asyncio.create_task(send_handler())
-        receive_task = asyncio.create_task(receive_handler())
-        
-        context.add_task(send_task)
-        context.add_task(receive_task)
-        
-        # Wait for completion
-        await context.wait_for_completion()
+        async with asyncio.TaskGroup() as tg:
+            context.add_task(tg.create_task(send_handler()))
+            context.add_task(tg.create_task(receive_handler()))
     
     def get_active_session_count(self) -> int:
         """Get the number of currently active sessions."""
@@ -118,14 +180,19 @@ class ConnectionManager:
     
     async def shutdown_all_sessions(self):
         """Gracefully shutdown all active sessions."""
-        for context in self.active_sessions.values():
+        contexts = list(self.active_sessions.values())
+        for context in contexts:
             context.close_session()
         
-        # Wait a bit for graceful shutdowns
-        await asyncio.sleep(1.0)
+        # Give sessions up to a second to wind down, returning as soon as all have
+        if contexts:
+            waiters = [asyncio.ensure_future(context.wait_for_completion()) for context in contexts]
+            _, pending = await asyncio.wait(waiters, timeout=1.0)
+            for waiter in pending:
+                waiter.cancel()
         
         # Cancel any remaining tasks
-        for context in self.active_sessions.values():
+        for context in contexts:
             context.cancel_tasks()
 
 
@@ -138,15 +205,16 @@ class WebSocketServer:
         self.connection_manager = ConnectionManager()
         self._server: Optional[Any] = None
     
-    async def start(self, session_handler: Callable, ping_interval: int = 20, 
-                   ping_timeout: int = 10) -> None:
+    async def start(self, session_handler: Callable,
+                   ping_interval: Optional[int] = WEBSOCKET_PING_INTERVAL,
+                   ping_timeout: Optional[int] = WEBSOCKET_PING_TIMEOUT) -> None:
         """
         Start the WebSocket server.
         
         Args:
             session_handler: Function to handle individual sessions
-            ping_interval: WebSocket ping interval in seconds
-            ping_timeout: WebSocket ping timeout in seconds
+            ping_interval: WebSocket ping interval in seconds (None disables keepalive pings)
+            ping_timeout: WebSocket ping timeout in seconds (None never closes on a missing pong)
         """
         async def connection_wrapper(client_websocket: websockets.ServerProtocol, path: str):
             client_addr = f"{client_websocket.remote_address[0]}:{client_websocket.remote_address[1]}"
@@ -159,15 +227,21 @@ class WebSocketServer:
             self.host,
             self.port,
             ping_interval=ping_interval,
-            ping_timeout=ping_timeout
+            ping_timeout=ping_timeout,
+            compression=WEBSOCKET_COMPRESSION,
+            max_size=WEBSOCKET_MAX_SIZE,
+            write_limit=WEBSOCKET_WRITE_LIMIT
         ):
-            print(f"WebSocket server running on {self.host}:{self.port}")
-            print(f"Ping interval: {ping_interval}s, Ping timeout: {ping_timeout}s")
+            logger.info("WebSocket server running on %s:%s", self.host, self.port)
+            if ping_interval is None:
+                logger.info("Ping disabled")
+            else:
+                logger.info("Ping interval: %ss, Ping timeout: %ss", ping_interval, ping_timeout)
             
             try:
                 await asyncio.Future()  # Keep running indefinitely
             except KeyboardInterrupt:
-                print("Shutting down server...")
+                logger.info("Shutting down server...")
                 await self.connection_manager.shutdown_all_sessions()
     
     def get_status(self) -> dict[str, Any]:
@@ -198,15 +272,15 @@ async def handle_connection_errors(operation: Callable, context: SessionContext)
         await operation()
         return True
     except websockets.exceptions.ConnectionClosedOK:
-        print(f"Client {context.client_addr} connection closed normally")
+        logger.info("Client %s connection closed normally", context.client_addr)
         return False
     except websockets.exceptions.ConnectionClosed as e:
         if e.code == 1011:
-            print(f"Client {context.client_addr} connection closed due to keepalive timeout")
+            logger.info("Client %s connection closed due to keepalive timeout", context.client_addr)
         else:
-            print(f"Client {context.client_addr} WebSocket connection closed: {e}")
+            logger.info("Client %s WebSocket connection closed: %s", context.client_addr, e)
         return False
     except Exception as e:
-        print(f"Error in operation for {context.client_addr}: {e}")
+        logger.warning("Error in operation for %s: %s", context.client_addr, e)
         context.logger.log_error(context.client_addr, str(e))
         return False
\ No newline at end of file
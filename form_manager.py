@@ -3,137 +3,336 @@ Unified form management for both dating profiles and PDF forms.
 Consolidates state management and validation logic.
 """
 
-import json
-import time
-from typing import Dict, Any, List, Optional, Tuple
+import functools
+import hashlib
+import os
+import re
+import sys
+import threading
+import weakref
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 from pdf_form.catalog import compute_field_catalog, build_initial_system_message
 from pdf_form.updater import apply_pdf_field_updates
-from config import MAX_FIELD_VALUE_LENGTH
+import json_utils
+from config import MAX_FIELD_VALUE_LENGTH, PDF_FORM_INSTRUCTION_TEMPLATE, PDF_TOOL_DECLARATIONS
+from session_manager import FormSession
 
 import fitz  # PyMuPDF
 
-def extract_pdf_form_metadata(pdf_path: str):
-    """
-    Extract ordered field metadata from a fillable PDF form,
-    distinguishing between checkboxes and radio buttons when possible.
 
-    Args:
-        pdf_path (str): Path to the PDF file.
+@functools.lru_cache(maxsize=64)
+def _render_pdf_instruction(total: int) -> str:
+    """Render the PDF system instruction; output depends only on the field count."""
+    return PDF_FORM_INSTRUCTION_TEMPLATE.format(total=total)
 
-    Returns:
-        list[dict]: Ordered list of field metadata dictionaries.
-    """
-    type_map = {
-        7: "string",   # text
-        3: "dropdown", # choice field (list/combo box)
-        2: "button"    # checkbox or radio (we refine below)
-    }
 
-    doc = fitz.open(pdf_path)
-    fields = []
+@functools.lru_cache(maxsize=128)
+def _field_catalog(field_names: Tuple[str, ...]) -> Dict[str, object]:
+    """Cached compute_field_catalog; sessions on the same form share the result (read-only)."""
+    return compute_field_catalog(list(field_names))
+
+
+@functools.lru_cache(maxsize=128)
+def _catalog_message(field_names: Tuple[str, ...], catalog_hash: str) -> str:
+    """Cached build_initial_system_message for reconnects to the same form."""
+    return build_initial_system_message(list(field_names), catalog_hash)
+
+# Extracted metadata keyed by (abspath, mtime_ns, size) or a digest of the bytes.
+# Entries are tuples of read-only mappings so callers cannot corrupt the cache.
+_METADATA_CACHE: "OrderedDict[Any, Tuple[Mapping[str, Any], ...]]" = OrderedDict()
+_METADATA_CACHE_SIZE = 64
+_METADATA_CACHE_LOCK = threading.Lock()
+
+
+def _cached_metadata(key, extract):
+    """Return cached metadata for key, running extract() on a miss (LRU)."""
+    with _METADATA_CACHE_LOCK:
+        fields = _METADATA_CACHE.get(key)
+        if fields is not None:
+            _METADATA_CACHE.move_to_end(key)
+            return fields
+    fields = tuple(MappingProxyType(f) for f in extract())
+    with _METADATA_CACHE_LOCK:
+        _METADATA_CACHE[key] = fields
+        if len(_METADATA_CACHE) > _METADATA_CACHE_SIZE:
+            _METADATA_CACHE.popitem(last=False)
+    return fields
 
-    for page_num, page in enumerate(doc):
-        widgets = page.widgets()
-        if not widgets:
-            continue
 
-        for w in widgets:
-            base_type = type_map.get(w.field_type, "unknown")
+_WIDGET_TYPE_MAP = {
+    7: "string",   # text
+    3: "dropdown", # choice field (list/combo box)
+    2: "button"    # checkbox or radio (we refine below)
+}
 
+# Below this page count a process pool costs more to start than it saves
+PARALLEL_EXTRACT_MIN_PAGES = 8
+
+
+def _walk_widgets(doc, pages) -> Tuple[List[Dict[str, Any]], List[Tuple[int, float, float]]]:
+    """Collect raw widget metadata and visual sort keys for the given page numbers."""
+    fields = []
+    # Visual-order sort keys kept alongside fields so sorting compares plain tuples
+    sort_keys = []
+    for page_num in pages:
+        # Follow MuPDF's widget linked list directly rather than the widgets() generator.
+        # Keep the page referenced: widgets become unbound once it is collected.
+        page = doc[page_num]
+        w = page.first_widget
+        while w is not None:
+            base_type = _WIDGET_TYPE_MAP.get(w.field_type, "unknown")
+            r = w.rect  # property builds a new Rect on each access
+            x0, y0 = r.x0, r.y0
+
+            name = w.field_name
             field_info = {
-                "pdf_field_name": w.field_name,
+                "pdf_field_name": sys.intern(name) if name else name,
                 "base_type": base_type,
                 "options": getattr(w, "choice_values", None),
                 "tooltip": w.field_label or "",
-                "rect": [w.rect.x0, w.rect.y0, w.rect.x1, w.rect.y1],
+                "rect": [x0, y0, r.x1, r.y1],
                 "page": page_num,
                 "export_value": getattr(w, "field_value", None),  # helps distinguish radios
+                # Buttons are typed once all widget names are known
+                "type": None if base_type == "button" else base_type,
             }
             fields.append(field_info)
+            sort_keys.append((page_num, y0, x0))
+            w = w.next
+    return fields, sort_keys
+
 
+def _finalize_fields(fields: List[Dict[str, Any]], sort_keys: List[Tuple[int, float, float]]) -> List[Dict[str, Any]]:
+    """Type button widgets and return fields in visual order."""
     # --- Group detection for buttons ---
     # If multiple widgets share the same name => radio group
-    name_counts = {}
-    for f in fields:
-        if f["base_type"] == "button":
-            name_counts[f["pdf_field_name"]] = name_counts.get(f["pdf_field_name"], 0) + 1
-
-    for f in fields:
-        if f["base_type"] != "button":
-            continue
-        if name_counts[f["pdf_field_name"]] > 1:
-            f["type"] = "radio"
-        else:
-            f["type"] = "checkbox"
-
-    # Normalize non-buttons
-    for f in fields:
-        if f["base_type"] != "button":
-            f["type"] = f["base_type"]
+    buttons = [f for f in fields if f["type"] is None]
+    if buttons:
+        name_counts = Counter(f["pdf_field_name"] for f in buttons)
+        for f in buttons:
+            f["type"] = "radio" if name_counts[f["pdf_field_name"]] > 1 else "checkbox"
 
     # Sort by tab order if present, else fallback to visual order
-    fields_sorted = sorted(fields, key=lambda f: (f["page"], f["rect"][1], f["rect"][0]))
-    return fields_sorted
+    order = sorted(range(len(fields)), key=sort_keys.__getitem__)
+    return [fields[i] for i in order]
+
+
+def _extract_pages(source, start: int, stop: int):
+    """Process-pool worker: open the PDF (path or bytes) and walk pages [start, stop)."""
+    if isinstance(source, str):
+        doc = fitz.open(source)
+    else:
+        doc = fitz.open(stream=source, filetype="pdf")
+    with doc:
+        return _walk_widgets(doc, range(start, stop))
+
+
+def _extract_metadata(source, num_workers: int = 1) -> List[Dict[str, Any]]:
+    """Extract ordered field metadata from a path or bytes, optionally across processes.
+
+    MuPDF documents cannot be shared between processes, so each worker opens its
+    own copy and walks a contiguous slice of pages.
+    """
+    if isinstance(source, str):
+        doc = fitz.open(source)
+    else:
+        doc = fitz.open(stream=source, filetype="pdf")
+    with doc:
+        page_count = doc.page_count
+        if num_workers <= 1 or page_count < PARALLEL_EXTRACT_MIN_PAGES:
+            return _finalize_fields(*_walk_widgets(doc, range(page_count)))
+
+    workers = min(num_workers, page_count)
+    step = -(-page_count // workers)
+    bounds = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    fields: List[Dict[str, Any]] = []
+    sort_keys: List[Tuple[int, float, float]] = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_fields, chunk_keys in executor.map(
+            _extract_pages, [source] * len(bounds), *zip(*bounds)
+        ):
+            fields.extend(chunk_fields)
+            sort_keys.extend(chunk_keys)
+    return _finalize_fields(fields, sort_keys)
+
+
+def extract_pdf_form_metadata(pdf_path: str, num_workers: int = 1):
+    """
+    Extract ordered field metadata from a fillable PDF form,
+    distinguishing between checkboxes and radio buttons when possible.
+    Results are cached until the file's mtime or size changes.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        num_workers (int): Opt-in process count for walking pages in parallel;
+            ignored for documents under PARALLEL_EXTRACT_MIN_PAGES pages.
+
+    Returns:
+        tuple[Mapping]: Ordered, read-only field metadata mappings.
+    """
+    path = os.path.abspath(pdf_path)
+    st = os.stat(path)
+    return _cached_metadata(
+        ("path", path, st.st_mtime_ns, st.st_size),
+        lambda: _extract_metadata(path, num_workers),
+    )
 
-def extract_pdf_form_metadata_from_bytes(pdf_bytes: bytes):
+def extract_pdf_form_metadata_from_bytes(pdf_bytes: bytes, num_workers: int = 1):
     """
     Extract ordered field metadata from a fillable PDF form given raw bytes.
     Mirrors extract_pdf_form_metadata but accepts bytes and keeps the same
-    output shape so downstream code can reuse it.
+    output shape so downstream code can reuse it. Cached by content digest.
 
     Returns:
-        list[dict]: Ordered list of field metadata dictionaries.
+        tuple[Mapping]: Ordered, read-only field metadata mappings.
     """
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    type_map = {
-        7: "string",   # text
-        3: "dropdown", # choice field (list/combo box)
-        2: "button"    # checkbox or radio (we refine below)
-    }
+    digest = hashlib.blake2b(pdf_bytes, digest_size=16).digest()
+    return _cached_metadata(("bytes", digest), lambda: _extract_metadata(pdf_bytes, num_workers))
+
+# Trailing " #<n>" suffix added to disambiguate repeated display names
+_DISAMB_RE = re.compile(r" #[2-9]$")
 
-    fields = []
-    for page_num, page in enumerate(doc):
-        widgets = page.widgets()
-        if not widgets:
-            continue
-        for w in widgets:
-            base_type = type_map.get(w.field_type, "unknown")
-            field_info = {
-                "pdf_field_name": w.field_name,
-                "base_type": base_type,
-                "options": getattr(w, "choice_values", None),
-                "tooltip": w.field_label or "",
-                "rect": [w.rect.x0, w.rect.y0, w.rect.x1, w.rect.y1],
-                "page": page_num,
-                "export_value": getattr(w, "field_value", None),
-            }
-            fields.append(field_info)
 
-    name_counts = {}
-    for f in fields:
-        if f["base_type"] == "button":
-            name_counts[f["pdf_field_name"]] = name_counts.get(f["pdf_field_name"], 0) + 1
+def _alias_base_map(alias_map: Dict[str, str]) -> Dict[str, str]:
+    """Map base display names (suffix stripped) to their canonical name when unambiguous."""
+    base_map: Dict[str, str] = {}
+    try:
+        tmp: Dict[str, set] = {}
+        for alias, canon in alias_map.items():
+            tmp.setdefault(_DISAMB_RE.sub("", alias), set()).add(canon)
+        for base, cset in tmp.items():
+            if len(cset) == 1:
+                base_map[base] = next(iter(cset))
+    except Exception:
+        pass
+    return base_map
 
-    for f in fields:
-        if f["base_type"] != "button":
-            continue
-        f["type"] = "radio" if name_counts.get(f["pdf_field_name"], 0) > 1 else "checkbox"
+def _build_schema_prompt_views(schema) -> Tuple[List[str], List[str], List[str]]:
+    """Build (display_list, allowed_lines, group_lines) for the initial message."""
+    group_lines: List[str] = []
+    allowed_lines: List[str] = []
+    # Build disambiguated display alias list in order, matching server mapping logic
+    raw_list = [getattr(f, 'display_name', f.name) or f.name for f in schema.fields]
+    counts: Dict[str, int] = defaultdict(int)
+    display_list = []
+    for name in raw_list:
+        counts[name] += 1
+        n = counts[name]
+        display_list.append(name if n == 1 else f"{name} #{n}")
+    # Build allowed values lines for radio/choice fields with their disambiguated aliases
+    try:
+        for i, field in enumerate(schema.fields):
+            try:
+                kind = getattr(field, 'kind', None) or getattr(field, 'field_type', None)
+                allowed = getattr(field, 'allowed_values', None)
+                alias = display_list[i]
+                if kind in ('choice', 'radio') and allowed:
+                    allowed_lines.append(f"{alias}: {', '.join(map(str, allowed))}")
+            except Exception:
+                continue
+    except Exception:
+        pass
+    # Surface any groups from normalizer metadata
+    try:
+        groups = (schema.metadata or {}).get('groups') or []
+        for g in groups:
+            label = (g.get('group_label') or g.get('group_id') or '').strip()
+            opts = g.get('options') or []
+            kind = (g.get('kind') or '').strip()
+            suffix = ''
+            if kind == 'checkbox':
+                suffix = ' (multi-select: check all that apply)'
+            elif kind == 'radio':
+                suffix = ' (single select)'
+            if label:
+                if opts:
+                    group_lines.append(f"Group: {label}{suffix} — options: {', '.join(opts)}")
+                else:
+                    group_lines.append(f"Group: {label}{suffix}")
+    except Exception:
+        pass
+    return display_list, allowed_lines, group_lines
 
-    for f in fields:
-        if f["base_type"] != "button":
-            f["type"] = f["base_type"]
 
-    fields_sorted = sorted(fields, key=lambda f: (f["page"], f["rect"][1], f["rect"][0]))
-    return fields_sorted
+def _make_alias_remap(alias_map: Dict[str, str], base_map: Dict[str, str]):
+    """Specialize the alias -> canonical key remap for one session's maps.
+
+    Both maps are bound as defaults so the per-key lookups resolve as locals.
+    """
+    # Interned canonical names match PDFFormState's interned keys by identity
+    alias_map = {alias: sys.intern(canon) for alias, canon in alias_map.items()}
+    base_map = {base: sys.intern(canon) for base, canon in base_map.items()}
+
+    def remap(parsed: Dict[str, Any], _am_get=alias_map.get, _bm_get=base_map.get) -> Dict[str, Any]:
+        return {(_am_get(k) or _bm_get(k, k)): v for k, v in parsed.items()}
+    return remap
+
+
+_ALIAS_NOTE = (
+    "IMPORTANT: When calling update_pdf_fields, use the DISPLAY NAMES exactly as listed below. "
+    "The server will map them to canonical field names."
+)
+_GROUPS_FOOTER = (
+    "When updating grouped fields, send updates for each field within the group as needed. "
+    "For checkbox groups, multiple options may be true. For radio groups, choose exactly one value.\n"
+)
+
+
+def _build_schema_prompt_text(schema) -> Tuple[Optional[str], str]:
+    """Return (first_display, static_text) for the schema's part of the initial message.
+
+    static_text covers the display-name, allowed-value and group sections; only the
+    catalog header and the closing request line vary per session.
+    """
+    display_list, allowed_lines, group_lines = _build_schema_prompt_views(schema)
+    if not display_list:
+        return None, ""
+    # Collect pieces and join once instead of growing a string with +=
+    parts = [
+        "Display names (use these in tool calls, same order):\n",
+        "\n".join(display_list), "\n", _ALIAS_NOTE, "\n",
+    ]
+    if allowed_lines:
+        parts += ("\nAllowed values for dropdown/radio fields (use exactly as shown):\n", "\n".join(allowed_lines), "\n")
+    if group_lines:
+        parts += ("\nRecognized groups (some fields are part of a single question with options):\n", "\n".join(group_lines), "\n", _GROUPS_FOOTER)
+    return display_list[0], "".join(parts)
+
+
+# Prompt text per live schema object; entries drop when the schema is collected
+_SCHEMA_PROMPTS: Dict[int, Tuple[Optional[str], str]] = {}
+
+
+def _schema_prompt_text(schema) -> Tuple[Optional[str], str]:
+    """Cached _build_schema_prompt_text (FormSchema is an unhashable dataclass, so key on id)."""
+    key = id(schema)
+    text = _SCHEMA_PROMPTS.get(key)
+    if text is None:
+        text = _build_schema_prompt_text(schema)
+        _SCHEMA_PROMPTS[key] = text
+        weakref.finalize(schema, _SCHEMA_PROMPTS.pop, key, None)
+    return text
+
+
+# Tool-call payloads that carry no updates
+_EMPTY_UPDATES = frozenset(("", "{}", "null"))
+# Shared empty field list for no-op and error summaries (callers only read these)
+_NO_FIELDS: Tuple[str, ...] = ()
+
 
 class FormState:
     """Base class for form state management."""
     
+    __slots__ = ('state', 'confirmed', 'complete', 'last_activity')
+    
     def __init__(self):
         self.state: Dict[str, Any] = {}
         self.confirmed: Dict[str, bool] = {}
         self.complete = False
-        self.last_activity = time.time()
+        self.last_activity = FormSession.clock
     
     def get_missing_fields(self) -> List[str]:
         """Return list of fields that are not filled."""
@@ -144,79 +343,185 @@ class FormState:
         return all(self.state.values())
     
     def touch(self):
-        """Update last activity timestamp."""
-        self.last_activity = time.time()
+        """Update last activity timestamp (coarse; see FormSession.clock)."""
+        self.last_activity = FormSession.clock
     
     def get_snapshot(self) -> Dict[str, Any]:
         """Get current state snapshot."""
+        missing = self.get_missing_fields()
         return {
             "state": self.state.copy(),
-            "missing": self.get_missing_fields(),
+            "missing": missing,
             "confirmed": self.confirmed.copy(),
-            "complete": self.is_complete()
+            "complete": not missing
         }
 
 
 class PDFFormState(FormState):
     """State management for PDF forms."""
     
+    __slots__ = (
+        'field_names', '_field_names_tuple', '_field_names_set', 'form_id',
+        'catalog', 'catalog_hash', 'all_confirmed', '_missing', '_version', '_snapshot',
+        '_snapshot_json',
+    )
+    
     def __init__(self, field_names: List[str], form_id: str):
         super().__init__()
+        # Interned so concurrent sessions on the same form share one copy of each key
+        field_names = [sys.intern(name) for name in field_names]
         self.field_names = field_names
+        self._field_names_tuple = tuple(field_names)
+        self._field_names_set = frozenset(field_names)
         self.form_id = form_id
-        self.state = {name: None for name in field_names}
-        self.confirmed = {name: False for name in field_names}
-        self.catalog = compute_field_catalog(field_names)
+        self.state = dict.fromkeys(field_names)
+        self.confirmed = dict.fromkeys(field_names, False)
+        self.catalog = _field_catalog(self._field_names_tuple)
+        self.catalog_hash = self.catalog["hash"]
         self.all_confirmed = False
+        # Unfilled field names, kept in step with self.state so completeness checks are O(1)
+        self._missing = set(self.state)
+        # Bumped on every mutation; get_snapshot reuses its last result while unchanged
+        self._version = 0
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_json: Optional[Tuple[int, str]] = None
+    
+    def get_missing_fields(self) -> List[str]:
+        """Return unfilled fields in form order."""
+        missing = self._missing
+        if not missing:
+            return []
+        return [name for name in self.state if name in missing]
+    
+    def is_complete(self) -> bool:
+        """Check if all fields are filled."""
+        return not self._missing
+    
+    def set_field(self, name: str, value: Any) -> None:
+        """Directly set a field (user edits), keeping the missing-field index in sync."""
+        self.state[name] = value
+        self.confirmed[name] = True
+        if value:
+            self._missing.discard(name)
+        else:
+            self._missing.add(name)
+        self._version += 1
     
     def validate_and_update(self, updates_json: str) -> Dict[str, Any]:
         """Validate and apply updates to PDF form fields."""
+        if isinstance(updates_json, str) and updates_json.strip() in _EMPTY_UPDATES:
+            # The model sometimes calls the tool with nothing to apply; skip parse and updater
+            self.touch()
+            return self._empty_update_summary()
         try:
             # Parse JSON string to dictionary
-            if isinstance(updates_json, str):
-                updates_dict = json.loads(updates_json)
+            if isinstance(updates_json, (str, bytes)):
+                updates_dict = json_utils.loads(updates_json)
             else:
                 updates_dict = updates_json
                 
             if not isinstance(updates_dict, dict):
-                return {"applied": {}, "unknown_fields": [], "errors": ["updates must be a JSON object"]}
+                return {"applied": {}, "unknown_fields": _NO_FIELDS, "errors": ["updates must be a JSON object"]}
                 
-        except (json.JSONDecodeError, TypeError) as e:
-            return {"applied": {}, "unknown_fields": [], "errors": [f"Invalid JSON: {e}"]}
+        except (json_utils.JSONDecodeError, TypeError) as e:
+            return {"applied": {}, "unknown_fields": _NO_FIELDS, "errors": [f"Invalid JSON: {e}"]}
         
+        return self._apply_dict(updates_dict)
+    
+    def _apply_dict(self, updates_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply an already-parsed name -> value mapping."""
         # Apply updates using existing updater logic
+        # The updater keeps self._missing in step and reads the remaining counts from it
         summary = apply_pdf_field_updates(
-            updates_dict, self.state, self.confirmed, self.field_names
+            updates_dict, self.state, self.confirmed, self.field_names,
+            self._field_names_set, self._missing
         )
-        summary["catalog_hash"] = self.catalog["hash"]
+        summary["catalog_hash"] = self.catalog_hash
+        if summary["applied"]:
+            self._version += 1
         
         self.touch()
         return summary
     
+    def _empty_update_summary(self) -> Dict[str, Any]:
+        """Summary in apply_pdf_field_updates' shape for a no-op update."""
+        missing = self.get_missing_fields()
+        return {
+            "applied": {},
+            "unknown_fields": _NO_FIELDS,
+            "conflicts_user_locked": _NO_FIELDS,
+            "unchanged": _NO_FIELDS,
+            "remaining_sample": missing[:8],
+            "remaining_empty_count": len(missing),
+            "filled_count": len(self.state) - len(missing),
+            "complete": not missing,
+            "catalog_hash": self.catalog_hash,
+        }
+    
     def get_snapshot(self) -> Dict[str, Any]:
-        """Get current state snapshot with PDF-specific metadata."""
-        snapshot = super().get_snapshot()
-        snapshot.update({
-            "catalog_hash": self.catalog["hash"],
-            "remaining_count": len(self.get_missing_fields()),
-            "filled_count": len([k for k, v in self.state.items() if v]),
-            "remaining_sample": self.get_missing_fields()[:10],
-            "form_id": self.form_id
-        })
+        """Get current state snapshot with PDF-specific metadata.
+
+        The returned dict is shared between calls until the next update, so
+        callers must treat it as read-only.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot["version"] == self._version:
+            return snapshot
+        missing = self.get_missing_fields()
+        self._snapshot = snapshot = {
+            "state": self.state.copy(),
+            "missing": missing,
+            "confirmed": self.confirmed.copy(),
+            "complete": not missing,
+            "catalog_hash": self.catalog_hash,
+            "remaining_count": len(missing),
+            "filled_count": len(self.state) - len(missing),
+            "remaining_sample": missing[:10],
+            "form_id": self.form_id,
+            "version": self._version
+        }
         return snapshot
+    
+    def get_snapshot_json(self) -> str:
+        """JSON text of get_snapshot(), serialized once per state version."""
+        cached = self._snapshot_json
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        text = json_utils.dumps(self.get_snapshot())
+        self._snapshot_json = (self._version, text)
+        return text
 
 
 class FormManager:
     """Manager for PDF forms."""
     
+    __slots__ = (
+        'form_state', '_alias_to_canonical', '_remap', '_get_session',
+        '_system_instruction', '_initial_message',
+    )
+    
     def __init__(self, field_names: List[str], form_id: str):
         self.form_state: PDFFormState = PDFFormState(field_names, form_id)
+        # Lazily built by the system_instruction / initial_message properties
+        self._system_instruction: Optional[str] = None
+        self._initial_message: Optional[str] = None
         self._alias_to_canonical = None  # populated from session schema metadata when available
+        self._remap = None  # specialized for _alias_to_canonical by _make_alias_remap
+        # Upload-session lookup bound once (unified app: HTTP and WS share one process)
+        try:
+            import server  # type: ignore
+            self._get_session = server.session_manager.get_session
+        except Exception:
+            self._get_session = None
     
     def get_state_snapshot(self) -> Dict[str, Any]:
         """Get current form state snapshot."""
         return self.form_state.get_snapshot()
     
+    def get_state_snapshot_json(self) -> str:
+        """Get the current snapshot as JSON text (cached until the next update)."""
+        return self.form_state.get_snapshot_json()
+    
     def get_missing_fields(self) -> List[str]:
         """Get list of missing fields."""
         return self.form_state.get_missing_fields()
@@ -225,136 +530,87 @@ class FormManager:
         """Update form fields."""
         # For PDF mode, expect updates as JSON string mapping names->values
         updates_json = updates.get("updates", "{}")
+        if isinstance(updates_json, str) and updates_json.strip() in _EMPTY_UPDATES:
+            # Nothing to remap; validate_and_update answers this without parsing
+            return self.form_state.validate_and_update(updates_json)
+        remapped = None
         # Try to map display aliases to canonical names using the live session schema metadata
         try:
-            # Import server session manager in-process (unified app)
-            import server  # type: ignore
-            session = server.session_manager.get_session(self.form_state.form_id)
+            session = self._get_session(self.form_state.form_id) if self._get_session else None
             alias_map = None
-            if session and session.schema and isinstance(updates_json, str):
+            if session and session.schema and isinstance(updates_json, (str, dict)):
                 alias_map = session.schema.metadata.get("display_alias_to_canonical")
-            if alias_map and isinstance(updates_json, str):
+            if alias_map:
+                if isinstance(updates_json, str):
+                    # Parse at most once here; the remapped dict goes to the updater as-is
+                    try:
+                        parsed = json_utils.loads(updates_json)
+                    except json_utils.JSONDecodeError as e:
+                        # Report directly rather than failing the same parse again downstream
+                        return {"applied": {}, "unknown_fields": _NO_FIELDS, "errors": [f"Invalid JSON: {e}"]}
+                else:
+                    parsed = updates_json
+                if not isinstance(parsed, dict):
+                    return {"applied": {}, "unknown_fields": _NO_FIELDS, "errors": ["updates must be a JSON object"]}
                 try:
-                    parsed = json.loads(updates_json)
-                    if isinstance(parsed, dict):
-                        # Build a fallback map that accepts base display names when unique
-                        base_map = {}
-                        try:
-                            tmp = {}
-                            for alias, canon in alias_map.items():
-                                # Treat suffix pattern " #<n>" only at the end as disambiguation
-                                base = alias.rsplit(" #", 1)[0] if alias.endswith(tuple(f" #{i}" for i in range(2, 10))) else alias
-                                tmp.setdefault(base, set()).add(canon)
-                            for base, cset in tmp.items():
-                                if len(cset) == 1:
-                                    base_map[base] = next(iter(cset))
-                        except Exception:
-                            pass
-                        remapped = {}
-                        for k, v in parsed.items():
-                            key = alias_map.get(k)
-                            if not key:
-                                key = base_map.get(k, k)
-                            remapped[key] = v
-                        updates_json = json.dumps(remapped)
+                    # The schema's alias map is fixed after upload; rebuild only if it was replaced
+                    if alias_map is not self._alias_to_canonical:
+                        self._remap = _make_alias_remap(alias_map, _alias_base_map(alias_map))
+                        self._alias_to_canonical = alias_map
+                    remapped = self._remap(parsed)
                 except Exception:
                     # fall back to raw
                     pass
         except Exception:
             # If any error in alias mapping, continue with original
             pass
+        if remapped is not None:
+            # Already a dict: skip validate_and_update's parse step entirely
+            return self.form_state._apply_dict(remapped)
         return self.form_state.validate_and_update(updates_json)
     
     def get_system_instruction(self) -> str:
         """Get appropriate system instruction for the form."""
-        from config import PDF_FORM_INSTRUCTION_TEMPLATE
-        
-        total_fields = len(self.form_state.field_names)
-        return PDF_FORM_INSTRUCTION_TEMPLATE.format(total=total_fields)
+        return self.system_instruction
     
     def get_initial_message(self) -> str:
         """Get initial message to send to the AI model."""
-        catalog_msg = build_initial_system_message(
-            self.form_state.field_names, 
-            self.form_state.catalog["hash"]
+        return self.initial_message
+    
+    @property
+    def system_instruction(self) -> str:
+        """System instruction for this form (computed once per manager)."""
+        if self._system_instruction is None:
+            self._system_instruction = _render_pdf_instruction(len(self.form_state.field_names))
+        return self._system_instruction
+    
+    @property
+    def initial_message(self) -> str:
+        """Initial priming message, built once from the catalog and upload-session schema."""
+        if self._initial_message is None:
+            self._initial_message = self._build_initial_message()
+        return self._initial_message
+    
+    def _build_initial_message(self) -> str:
+        catalog_msg = _catalog_message(
+            self.form_state._field_names_tuple,
+            self.form_state.catalog_hash
         )
         # Prefer to speak and USE display names for tool calls; the backend maps to canonical.
         try:
-            import server  # type: ignore
-            session = server.session_manager.get_session(self.form_state.form_id)
-            display_list = None
-            group_lines: List[str] = []
-            allowed_lines: List[str] = []
+            session = self._get_session(self.form_state.form_id) if self._get_session else None
             if session and session.schema:
-                # Build disambiguated display alias list in order, matching server mapping logic
-                raw_list = [getattr(f, 'display_name', f.name) or f.name for f in session.schema.fields]
-                counts = {}
-                disamb = []
-                for name in raw_list:
-                    base = name
-                    if base in counts:
-                        counts[base] += 1
-                        disamb.append(f"{base} #{counts[base]}")
-                    else:
-                        counts[base] = 1
-                        disamb.append(base)
-                display_list = disamb
-                # Build allowed values lines for radio/choice fields with their disambiguated aliases
-                try:
-                    for i, field in enumerate(session.schema.fields):
-                        try:
-                            kind = getattr(field, 'kind', None) or getattr(field, 'field_type', None)
-                            allowed = getattr(field, 'allowed_values', None)
-                            alias = display_list[i]
-                            if kind in ('choice', 'radio') and allowed:
-                                allowed_lines.append(f"{alias}: {', '.join(map(str, allowed))}")
-                        except Exception:
-                            continue
-                except Exception:
-                    pass
-                # Surface any groups from normalizer metadata
-                try:
-                    groups = (session.schema.metadata or {}).get('groups') or []
-                    for g in groups:
-                        label = (g.get('group_label') or g.get('group_id') or '').strip()
-                        opts = g.get('options') or []
-                        kind = (g.get('kind') or '').strip()
-                        suffix = ''
-                        if kind == 'checkbox':
-                            suffix = ' (multi-select: check all that apply)'
-                        elif kind == 'radio':
-                            suffix = ' (single select)'
-                        if label:
-                            if opts:
-                                group_lines.append(f"Group: {label}{suffix} — options: {', '.join(opts)}")
-                            else:
-                                group_lines.append(f"Group: {label}{suffix}")
-                except Exception:
-                    pass
-            if display_list:
-                first_display = display_list[0]
-                alias_note = (
-                    "IMPORTANT: When calling update_pdf_fields, use the DISPLAY NAMES exactly as listed below. "
-                    "The server will map them to canonical field names."
-                )
-                msg = (
-                    f"{catalog_msg}\n\nCatalog hash: {self.form_state.catalog['hash']}\n"
-                    f"Display names (use these in tool calls, same order):\n" + "\n".join(display_list) + "\n" + alias_note + "\n"
-                )
-                if allowed_lines:
-                    msg += ("\nAllowed values for dropdown/radio fields (use exactly as shown):\n" + "\n".join(allowed_lines) + "\n")
-                if group_lines:
-                    msg += ("\nRecognized groups (some fields are part of a single question with options):\n" + "\n".join(group_lines) + "\n")
-                    msg += ("When updating grouped fields, send updates for each field within the group as needed. For checkbox groups, multiple options may be true. For radio groups, choose exactly one value.\n")
-                msg += (f"Begin by requesting the value for the first missing field: {first_display}")
-                return msg
+                first_display, static_text = _schema_prompt_text(session.schema)
+                if first_display:
+                    return (
+                        f"{catalog_msg}\n\nCatalog hash: {self.form_state.catalog_hash}\n{static_text}"
+                        f"Begin by requesting the value for the first missing field: {first_display}"
+                    )
         except Exception:
             pass
         first_field = self.form_state.field_names[0] if self.form_state.field_names else "first field"
-        return f"{catalog_msg}\n\nCatalog hash: {self.form_state.catalog['hash']}\nBegin by requesting the value for the first missing field: {first_field}"
+        return f"{catalog_msg}\n\nCatalog hash: {self.form_state.catalog_hash}\nBegin by requesting the value for the first missing field: {first_field}"
     
-    def get_tool_declarations(self) -> List[Dict[str, Any]]:
+    def get_tool_declarations(self) -> Tuple[Mapping[str, Any], ...]:
         """Get appropriate tool declarations for the form."""
-        from config import PDF_TOOL_DECLARATIONS
-        
         return PDF_TOOL_DECLARATIONS
\ No newline at end of file
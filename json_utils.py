@@ -0,0 +1,40 @@
+"""
+JSON helpers for the WebSocket hot paths.
+Uses orjson when installed and falls back to the stdlib json module otherwise.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except clause covers both
+JSONDecodeError = json.JSONDecodeError
+
+if orjson is not None:
+    def loads(data: Any) -> Any:
+        """Parse JSON from str or bytes."""
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Serialize to a JSON str (text frame friendly)."""
+        return orjson.dumps(obj).decode('utf-8')
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialize to UTF-8 JSON bytes (for binary file writes)."""
+        return orjson.dumps(obj)
+else:
+    def loads(data: Any) -> Any:
+        """Parse JSON from str or bytes."""
+        return json.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Serialize to a JSON str (text frame friendly)."""
+        return json.dumps(obj)
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialize to UTF-8 JSON bytes (for binary file writes)."""
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
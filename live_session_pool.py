@@ -0,0 +1,137 @@
+"""
+Pre-opened Gemini Live sessions.
+Opening a live session costs a websocket handshake plus a setup round trip before
+the first audio can flow, so a few unused sessions are kept ready for the connect
+signatures clients actually use.
+
+Only fresh sessions are pooled. A session that has carried a conversation holds
+that user's context and is always closed, never handed to another client.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Hashable, Optional, Tuple
+
+from websockets.protocol import State
+
+logger = logging.getLogger(__name__)
+
+# (created monotonic time, exit stack owning the connect context, session)
+_Entry = Tuple[float, contextlib.AsyncExitStack, Any]
+
+
+class LiveSessionPool:
+    """Keeps up to ``size`` unused live sessions per recently used connect signature."""
+
+    __slots__ = ('client', 'size', 'max_age', 'max_keys', '_idle', '_specs', '_filling', '_tasks', '_closed')
+
+    def __init__(self, client, size: int = 0, max_age: float = 120.0, max_keys: int = 4):
+        self.client = client
+        self.size = size
+        self.max_age = max_age
+        self.max_keys = max_keys
+        self._idle: Dict[Hashable, Deque[_Entry]] = {}
+        # key -> (model, config); most recently used last
+        self._specs: "OrderedDict[Hashable, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        self._filling: set = set()
+        # Background fill/close tasks, referenced until done
+        self._tasks: set = set()
+        self._closed = False
+
+    @contextlib.asynccontextmanager
+    async def session(self, key: Hashable, model: str, config: Dict[str, Any]):
+        """Yield a live session for (model, config), warm if one is pooled under key."""
+        entry = self._take(key) if self.size > 0 else None
+        if entry is not None:
+            _, stack, live_session = entry
+        else:
+            stack = contextlib.AsyncExitStack()
+            live_session = await stack.enter_async_context(self.client.aio.live.connect(model=model, config=config))
+        if self.size > 0:
+            self._remember(key, model, config)
+            self._schedule_fill(key)
+        try:
+            yield live_session
+        finally:
+            await stack.aclose()
+
+    def _take(self, key: Hashable) -> Optional[_Entry]:
+        idle = self._idle.get(key)
+        now = time.monotonic()
+        while idle:
+            entry = idle.popleft()
+            created, stack, live_session = entry
+            # Best effort: _ws is private to google-genai; without it only max_age applies
+            ws = getattr(live_session, '_ws', None)
+            if now - created < self.max_age and getattr(ws, 'state', State.OPEN) is State.OPEN:
+                return entry
+            self._close_later(stack)
+        return None
+
+    def _remember(self, key: Hashable, model: str, config: Dict[str, Any]):
+        self._specs[key] = (model, config)
+        self._specs.move_to_end(key)
+        while len(self._specs) > self.max_keys:
+            stale_key, _ = self._specs.popitem(last=False)
+            for _, stack, _ in self._idle.pop(stale_key, ()):
+                self._close_later(stack)
+
+    def _schedule_fill(self, key: Hashable):
+        if self._closed or key in self._filling:
+            return
+        self._filling.add(key)
+        self._spawn(self._fill(key)).add_done_callback(lambda _t: self._filling.discard(key))
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _close_later(self, stack: contextlib.AsyncExitStack):
+        self._spawn(self._close_quietly(stack))
+
+    @staticmethod
+    async def _close_quietly(stack: contextlib.AsyncExitStack):
+        try:
+            await stack.aclose()
+        except Exception as e:  # noqa: BLE001
+            logger.debug("Closing pooled live session failed: %s", e)
+
+    async def _fill(self, key: Hashable):
+        while not self._closed and key in self._specs and len(self._idle.get(key, ())) < self.size:
+            model, config = self._specs[key]
+            stack = contextlib.AsyncExitStack()
+            try:
+                live_session = await stack.enter_async_context(self.client.aio.live.connect(model=model, config=config))
+            except Exception as e:  # noqa: BLE001
+                logger.debug("Live session prewarm failed: %s", e)
+                await self._close_quietly(stack)
+                return
+            if self._closed or key not in self._specs:
+                await self._close_quietly(stack)
+                return
+            entry = (time.monotonic(), stack, live_session)
+            self._idle.setdefault(key, deque()).append(entry)
+            # Idle sessions hold upstream quota: close them at max_age even if traffic stops
+            asyncio.get_running_loop().call_later(self.max_age, self._expire, key, entry)
+
+    def _expire(self, key: Hashable, entry: _Entry):
+        idle = self._idle.get(key)
+        if not idle or entry not in idle:
+            return  # already taken, evicted or closed
+        idle.remove(entry)
+        self._close_later(entry[1])
+
+    async def close(self):
+        """Close every pooled session and stop refilling."""
+        self._closed = True
+        entries = [entry for idle in self._idle.values() for entry in idle]
+        self._idle.clear()
+        self._specs.clear()
+        for task in tuple(self._tasks):
+            task.cancel()
+        await asyncio.gather(*(self._close_quietly(stack) for _, stack, _ in entries))
@@ -1,14 +1,82 @@
-import json, time, threading, os
-from typing import Dict, Any
+import atexit, time, threading, os, logging, queue
+import logging.handlers
+import json_utils
+from typing import Dict, Any, Optional
 
 _LOG_LOCK = threading.Lock()
 LOG_FILE = os.path.join(os.getcwd(), "tool_calls.log")
 
-def log_tool_call(session_id: str, tool_name: str, request: Dict[str, Any], response: Dict[str, Any], started_ts: float):
+# Tool-call records are serialized by the caller and written by one background
+# thread that keeps the file open, so callers only pay for a queue put.
+_TOOL_LOG_QUEUE: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+_TOOL_LOG_BATCH = 64
+_tool_log_thread: Optional[threading.Thread] = None
+# Set once the log file cannot be opened or written; records are then dropped
+_tool_log_disabled = False
+
+def _tool_log_writer():
+    global _tool_log_thread, _tool_log_disabled
+    try:
+        _write_tool_log(_TOOL_LOG_QUEUE)
+    except OSError:
+        # Nothing would drain the queue any more: stop accepting records and discard the backlog
+        _tool_log_disabled = True
+        _tool_log_thread = None
+        while True:
+            try:
+                _TOOL_LOG_QUEUE.get_nowait()
+            except queue.Empty:
+                break
+
+def _write_tool_log(q: "queue.SimpleQueue[Optional[bytes]]"):
+    with open(LOG_FILE, "ab") as f:
+        while True:
+            line = q.get()
+            if line is None:
+                break
+            batch = [line]
+            while len(batch) < _TOOL_LOG_BATCH:
+                try:
+                    line = q.get_nowait()
+                except queue.Empty:
+                    break
+                if line is None:
+                    f.write(b"".join(batch))
+                    return
+                batch.append(line)
+            f.write(b"".join(batch))
+            f.flush()
+
+def _ensure_tool_log_writer() -> bool:
+    """Start the writer thread if needed; False when tool-call logging is disabled."""
+    global _tool_log_thread
+    if _tool_log_thread is not None:
+        return True
+    with _LOG_LOCK:
+        if _tool_log_disabled:
+            return False
+        if _tool_log_thread is None:
+            _tool_log_thread = threading.Thread(target=_tool_log_writer, daemon=True, name="ToolCallLog")
+            _tool_log_thread.start()
+            atexit.register(flush_tool_log)
+    return True
+
+def flush_tool_log(timeout: float = 2.0):
+    """Stop the tool-call writer after it drains pending records."""
+    global _tool_log_thread
+    thread = _tool_log_thread
+    if thread is None:
+        return
+    _TOOL_LOG_QUEUE.put(None)
+    thread.join(timeout)
+    _tool_log_thread = None
+
+def log_tool_call(session_id: str, tool_name: str, request: Dict[str, Any], response: Dict[str, Any], started_perf: float):
+    """Queue a tool-call record; started_perf is a time.perf_counter() reading."""
     try:
         rec = {
             "ts": time.time(),
-            "duration_ms": round((time.time() - started_ts) * 1000, 2),
+            "duration_ms": round((time.perf_counter() - started_perf) * 1000, 2),
             "session_id": session_id,
             "tool": tool_name,
             "request": request,
@@ -19,9 +87,36 @@ def log_tool_call(session_id: str, tool_name: str, request: Dict[str, Any], resp
                 "catalog_hash": response.get("catalog_hash") if isinstance(response, dict) else None,
             }
         }
-        line = json.dumps(rec, ensure_ascii=False)
-        with _LOG_LOCK:
-            with open(LOG_FILE, "a", encoding="utf-8") as f:
-                f.write(line + "\n")
+        if not _ensure_tool_log_writer():
+            return
+        _TOOL_LOG_QUEUE.put(json_utils.dumps_bytes(rec) + b"\n")
     except Exception:
         pass
+
+
+_LOG_LISTENER: Optional[logging.handlers.QueueListener] = None
+
+def setup_async_logging(level: str = "INFO", fmt: str = "%(levelname)s %(name)s: %(message)s") -> logging.handlers.QueueListener:
+    """Route root logging through a queue so the event loop never blocks on stdout.
+
+    Records are enqueued by a QueueHandler and written by a QueueListener thread.
+    Idempotent; call stop_async_logging() at shutdown to flush.
+    """
+    global _LOG_LISTENER
+    if _LOG_LISTENER is not None:
+        return _LOG_LISTENER
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(fmt))
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    _LOG_LISTENER = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _LOG_LISTENER.start()
+    return _LOG_LISTENER
+
+def stop_async_logging():
+    global _LOG_LISTENER
+    if _LOG_LISTENER is not None:
+        _LOG_LISTENER.stop()
+        _LOG_LISTENER = None
@@ -3,6 +3,7 @@ from typing import List, Dict, Any, Tuple
 from .schema import FormField, FormSchema
 import uuid
 import io
+import re
 
 try:
     from pypdf import PdfReader
@@ -27,6 +28,8 @@ INTERNAL_FIELD_CONTAINS = [
     "adobewarning",  # redundancy / safety
     "_spc",          # spacer artifacts
 ]
+# Single alternation so each name is scanned once by the regex engine
+INTERNAL_FIELD_CONTAINS_RE = re.compile("|".join(map(re.escape, INTERNAL_FIELD_CONTAINS)))
 
 class AcroFormError(Exception):
     pass
@@ -82,7 +85,7 @@ def extract_acroform(pdf_bytes: bytes, original_filename: str) -> FormSchema:
                 continue
             # Filter internal / non-user-visible fields
             lower = field_name.lower()
-            if lower in INTERNAL_FIELD_EXACT_LOWER or any(p in lower for p in INTERNAL_FIELD_CONTAINS):
+            if lower in INTERNAL_FIELD_EXACT_LOWER or INTERNAL_FIELD_CONTAINS_RE.search(lower):
                 filtered_internal.append(field_name)
                 continue
             original_name = field_name
@@ -182,7 +185,7 @@ def extract_acroform(pdf_bytes: bytes, original_filename: str) -> FormSchema:
                 if not field_name:
                     continue
                 lower = field_name.lower()
-                if lower in INTERNAL_FIELD_EXACT_LOWER or any(p in lower for p in INTERNAL_FIELD_CONTAINS):
+                if lower in INTERNAL_FIELD_EXACT_LOWER or INTERNAL_FIELD_CONTAINS_RE.search(lower):
                     filtered_internal.append(field_name)
                     continue
                 original_name = field_name
@@ -8,6 +8,10 @@ except ImportError:  # pragma: no cover
     PdfReader = None  # type: ignore
     PdfWriter = None  # type: ignore
 
+# Checkbox values arrive as strings from the model / UI
+_CHECKBOX_TRUE = frozenset(("true", "yes", "on", "1"))
+_CHECKBOX_FALSE = frozenset(("false", "no", "off", "0", ""))
+
 class PDFFormFillError(Exception):
     pass
 
@@ -74,9 +78,9 @@ def fill_acroform(original_pdf_bytes: bytes, values: Dict[str, Any]) -> bytes:
                     val = supplied
                     if isinstance(val, str):
                         lower = val.lower()
-                        if lower in {"true", "yes", "on", "1"}:
+                        if lower in _CHECKBOX_TRUE:
                             val = True
-                        elif lower in {"false", "no", "off", "0", ""}:
+                        elif lower in _CHECKBOX_FALSE:
                             val = False
                     kids = f.get("/Kids") or []
                     if not kids:
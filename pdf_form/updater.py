@@ -2,12 +2,15 @@ from __future__ import annotations
 """Updater logic for applying incremental PDF field updates.
 
 apply_pdf_field_updates(updates, session_state, allowed_fields) returns a summary dict.
+Callers that update repeatedly can pass a precomputed frozenset of the allowed names,
+and a maintained set of unfilled names so the remaining counts skip a full state scan.
 """
-from typing import Dict, Any, List
+from typing import AbstractSet, Dict, Any, List, Optional, Set
 import time
 
-def apply_pdf_field_updates(updates: Dict[str, str], state: Dict[str, Any], confirmed: Dict[str, bool], allowed_fields: List[str]):
-    allowed = set(allowed_fields)
+def apply_pdf_field_updates(updates: Dict[str, str], state: Dict[str, Any], confirmed: Dict[str, bool], allowed_fields: List[str],
+                            field_names_set: Optional[AbstractSet[str]] = None, missing: Optional[Set[str]] = None):
+    allowed = field_names_set if field_names_set is not None else set(allowed_fields)
     applied = {}
     unknown_fields = []
     conflicts_user_locked = []  # placeholder if you later track user vs AI provenance
@@ -31,20 +34,36 @@ def apply_pdf_field_updates(updates: Dict[str, str], state: Dict[str, Any], conf
             unchanged.append(k)
             continue
         # (Provenance logic could be inserted here)
-        state[k] = s[:500]
-        confirmed[k] = True
-        applied[k] = state[k]
+        applied[k] = s[:500]
 
-    empty = [f for f in allowed_fields if not state.get(f)]
-    filled = [f for f in allowed_fields if state.get(f)]
+    if applied:
+        # Merge accepted values in one pass rather than per key
+        state.update(applied)
+        confirmed.update(dict.fromkeys(applied, True))
+
+    if missing is not None:
+        # Applied values are never empty, so they simply leave the unfilled set
+        missing.difference_update(applied)
+        empty_count = len(missing)
+        sample = []
+        if missing:
+            for f in allowed_fields:
+                if f in missing:
+                    sample.append(f)
+                    if len(sample) == 8:
+                        break
+    else:
+        empty = [f for f in allowed_fields if not state.get(f)]
+        empty_count = len(empty)
+        sample = empty[:8]
     summary = {
         "applied": applied,
         "unknown_fields": unknown_fields,
         "conflicts_user_locked": conflicts_user_locked,
         "unchanged": unchanged,
-        "remaining_sample": empty[:8],
-        "remaining_empty_count": len(empty),
-        "filled_count": len(filled),
-        "complete": len(empty) == 0,
+        "remaining_sample": sample,
+        "remaining_empty_count": empty_count,
+        "filled_count": len(allowed_fields) - empty_count,
+        "complete": empty_count == 0,
         }
     return summary
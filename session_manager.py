@@ -5,15 +5,15 @@ Replaces the global FORM_SESSIONS dictionary with a proper class-based approach.
 
 import time
 import threading
-from typing import Dict, Optional, Any, List
+from typing import ClassVar, Dict, Optional, Any, List
 from dataclasses import dataclass
 from pdf_form.schema import FormSchema
 from config import FORM_SESSION_TIMEOUT, SESSION_CLEANUP_INTERVAL
 
 
-@dataclass
+@dataclass(slots=True)
 class FormSession:
-    """Represents a form session with metadata."""
+    """Represents a form session with metadata (slotted: one per live form)."""
     form_id: str
     schema: FormSchema
     state: Dict[str, Any]
@@ -22,18 +22,23 @@ class FormSession:
     completed: bool = False
     download_confirmed: bool = False
     created_at: float = None
+    # Coarse wall clock refreshed once per cleanup sweep; touch() stamps this
+    # instead of calling time.time() on every field update
+    clock: ClassVar[float] = time.time()
     
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = time.time()
     
     def touch(self):
-        """Update the last activity timestamp."""
-        self.last_activity = time.time()
+        """Update the last activity timestamp (sweep-interval resolution)."""
+        if FormSession.clock > self.last_activity:
+            self.last_activity = FormSession.clock
     
     def is_expired(self, timeout: float = FORM_SESSION_TIMEOUT) -> bool:
         """Check if the session has expired."""
-        return time.time() - self.last_activity > timeout
+        # Stamps may lag real activity by up to one sweep, so allow that much slack
+        return time.time() - self.last_activity > timeout + SESSION_CLEANUP_INTERVAL
     
     def get_missing_fields(self) -> List[str]:
         """Get list of fields that are not filled."""
@@ -136,11 +141,12 @@ class SessionManager:
             if form_id in self._sessions:
                 self.delete_session(form_id)
             
+            field_names = schema.ordered_field_names()
             session = FormSession(
                 form_id=form_id,
                 schema=schema,
-                state={fname: None for fname in schema.ordered_field_names()},
-                confirmed={fname: False for fname in schema.ordered_field_names()},
+                state=dict.fromkeys(field_names),
+                confirmed=dict.fromkeys(field_names, False),
                 last_activity=time.time()
             )
             
@@ -211,6 +217,7 @@ class SessionManager:
         """Clean up expired sessions. Returns number of sessions cleaned up."""
         cleaned_count = 0
         
+        FormSession.clock = time.time()
         with self._lock:
             expired_ids = []
             for form_id, session in self._sessions.items():
@@ -0,0 +1,55 @@
+import asyncio
+import os
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+os.environ.setdefault('GEMINI_API_KEY', 'test-key')
+
+import app  # noqa: E402
+import json_utils  # noqa: E402
+from audio_handler import AUDIO_FRAME_TAG, CONTROL_FRAME_TAG  # noqa: E402
+
+
+class FakeClientSocket:
+    """Async-iterable stand-in for the browser websocket."""
+
+    def __init__(self, messages):
+        self._messages = list(messages)
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for message in self._messages:
+            yield message
+            await asyncio.sleep(0)
+
+
+class SendToGeminiTest(unittest.IsolatedAsyncioTestCase):
+    async def test_non_dict_realtime_input_does_not_end_session(self):
+        client = FakeClientSocket([
+            json_utils.dumps({"realtime_input": None}),
+            json_utils.dumps({"realtime_input": "x"}),
+            '["realtime_input"]',
+            '"realtime_input"',
+            bytes([CONTROL_FRAME_TAG]) + b'["realtime_input"]',
+            bytes([AUDIO_FRAME_TAG]) + b"\x01\x02",
+        ])
+        send_pcm = mock.AsyncMock(return_value=True)
+        session_closed = asyncio.Event()
+        audio_handler = SimpleNamespace(
+            stream_handler=SimpleNamespace(send_pcm_to_gemini=send_pcm),
+            handle_realtime_audio_input=mock.AsyncMock(return_value=True),
+        )
+        with mock.patch.object(app, "AUDIO_HANDLER", audio_handler):
+            await asyncio.wait_for(
+                app.send_to_gemini(client, None, object(), None, None, session_closed), timeout=2
+            )
+        send_pcm.assert_awaited_once()
+        self.assertEqual(send_pcm.await_args.args[1], b"\x01\x02")
+        self.assertTrue(session_closed.is_set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,31 +3,35 @@ Tool response builder for handling Gemini API function calls.
 Consolidates response creation patterns and reduces code duplication.
 """
 
-import json
 import time
 from typing import Dict, Any, List, Optional
 import websockets
 
+import json_utils
 from logging_utils import log_tool_call
 
 
 class ToolCall:
     """Represents a single tool call with metadata."""
     
+    __slots__ = ('name', 'args', 'call_id', 'start_time')
+    
     def __init__(self, name: str, args: Dict[str, Any], call_id: str):
         self.name = name
         self.args = args or {}
         self.call_id = call_id
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()  # monotonic; for durations only
     
     def get_execution_time(self) -> float:
         """Get time elapsed since tool call started."""
-        return time.time() - self.start_time
+        return time.perf_counter() - self.start_time
 
 
 class ToolResponse:
     """Represents a tool response with structured data."""
     
+    __slots__ = ('tool_call', 'result', 'errors', 'success')
+    
     def __init__(self, tool_call: ToolCall, result: Any, errors: Optional[List[str]] = None):
         self.tool_call = tool_call
         self.result = result
@@ -53,20 +57,33 @@ class ToolResponse:
             tool_name=self.tool_call.name,
             request=self.tool_call.args,
             response=self.result,
-            started_ts=self.tool_call.start_time
+            started_perf=self.tool_call.start_time
         )
 
 
 class ClientNotification:
     """Represents a notification to send to the client WebSocket."""
     
-    def __init__(self, message_type: str, data: Any):
+    __slots__ = ('message_type', 'data', 'data_json')
+    
+    def __init__(self, message_type: str, data: Any, data_json: Optional[str] = None):
         self.message_type = message_type
         self.data = data
+        # Optional pre-serialized data (e.g. a cached state snapshot)
+        self.data_json = data_json
+    
+    def member_json(self) -> str:
+        """Serialize as a `"type":data` member of a JSON object."""
+        data_json = self.data_json
+        if data_json is None:
+            data_json = json_utils.dumps(self.data)
+        return json_utils.dumps(self.message_type) + ':' + data_json
     
     def to_json(self) -> str:
         """Convert to JSON string for WebSocket transmission."""
-        return json.dumps({self.message_type: self.data})
+        if self.data_json is None:
+            return json_utils.dumps({self.message_type: self.data})
+        return '{' + self.member_json() + '}'
     
     async def send_to_client(self, client_websocket: websockets.ServerProtocol) -> bool:
         """Send notification to client WebSocket."""
@@ -87,7 +104,7 @@ class ToolResponseBuilder:
         self.notifications: List[ClientNotification] = []
     
     def add_state_response(self, tool_call: ToolCall, state_snapshot: Dict[str, Any], 
-                          notification_type: str) -> 'ToolResponseBuilder':
+                          notification_type: str, state_json: Optional[str] = None) -> 'ToolResponseBuilder':
         """
         Add a state query response (get_profile_state, get_form_state).
         
@@ -95,11 +112,12 @@ class ToolResponseBuilder:
             tool_call: The tool call object
             state_snapshot: Current state data
             notification_type: Type of client notification to send
+            state_json: state_snapshot already serialized, reused for the client frame
         """
         response = ToolResponse(tool_call, state_snapshot)
         self.responses.append(response)
         
-        notification = ClientNotification(notification_type, state_snapshot)
+        notification = ClientNotification(notification_type, state_snapshot, state_json)
         self.notifications.append(notification)
         
         return self
@@ -142,11 +160,26 @@ class ToolResponseBuilder:
         """
         Send all client notifications.
         
+        Notifications with distinct message types are merged into one JSON
+        object and sent as a single frame; the client reads each key
+        independently.
+        
         Returns:
             Number of notifications sent successfully
         """
+        notifications = self.notifications
+        if len(notifications) > 1:
+            if len({n.message_type for n in notifications}) == len(notifications):
+                # Members are joined as text so pre-serialized snapshots are not re-encoded
+                merged = '{' + ','.join([n.member_json() for n in notifications]) + '}'
+                try:
+                    await client_websocket.send(merged)
+                    return len(notifications)
+                except Exception:
+                    # Failed to send client notifications
+                    return 0
         sent_count = 0
-        for notification in self.notifications:
+        for notification in notifications:
             if await notification.send_to_client(client_websocket):
                 sent_count += 1
         return sent_count
@@ -170,6 +203,37 @@ class ToolResponseBuilder:
         return self.get_function_responses()
 
 
+async def _get_form_state(builder: ToolResponseBuilder, tool_call: ToolCall, form_manager, pdf_sync):
+    builder.add_state_response(
+        tool_call, form_manager.get_state_snapshot(), "form_state", form_manager.get_state_snapshot_json()
+    )
+
+
+async def _update_pdf_fields(builder: ToolResponseBuilder, tool_call: ToolCall, form_manager, pdf_sync):
+    update_result = form_manager.update_fields(tool_call.args)
+    builder.add_pdf_form_response(tool_call, update_result)
+    
+    # Handle PDF sync if there were updates
+    if update_result.get("applied"):
+        await pdf_sync.sync_updates(update_result.get("applied", {}))
+        await pdf_sync.schedule_full_sync(form_manager)
+        # Also include a current state snapshot for UI reconciliation
+        try:
+            state_snapshot = form_manager.get_state_snapshot()
+            builder.add_state_response(
+                tool_call, state_snapshot, "form_state", form_manager.get_state_snapshot_json()
+            )
+        except Exception:
+            pass
+
+
+# Tool name -> handler; unknown names produce no function responses
+_PDF_FORM_TOOL_HANDLERS = {
+    "get_form_state": _get_form_state,
+    "update_pdf_fields": _update_pdf_fields,
+}
+
+
 class ToolCallHandler:
     """High-level handler for processing tool calls using the response builder."""
     
@@ -180,24 +244,9 @@ class ToolCallHandler:
         """Handle PDF form tool calls."""
         builder = ToolResponseBuilder(pdf_sync.form_id)
         
-        if tool_call.name == "get_form_state":
-            state_snapshot = form_manager.get_state_snapshot()
-            builder.add_state_response(tool_call, state_snapshot, "form_state")
-            
-        elif tool_call.name == "update_pdf_fields":
-            update_result = form_manager.update_fields(tool_call.args)
-            builder.add_pdf_form_response(tool_call, update_result)
-            
-            # Handle PDF sync if there were updates
-            if update_result.get("applied"):
-                await pdf_sync.sync_updates(update_result.get("applied", {}))
-                await pdf_sync.schedule_full_sync(form_manager)
-                # Also include a current state snapshot for UI reconciliation
-                try:
-                    state_snapshot = form_manager.get_state_snapshot()
-                    builder.add_state_response(tool_call, state_snapshot, "form_state")
-                except Exception:
-                    pass
+        handler = _PDF_FORM_TOOL_HANDLERS.get(tool_call.name)
+        if handler is not None:
+            await handler(builder, tool_call, form_manager, pdf_sync)
         
         return await builder.finalize(client_websocket)
 
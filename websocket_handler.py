@@ -4,7 +4,7 @@ Broken down into smaller, focused functions for better maintainability.
 """
 
 import asyncio
-import json
+import functools
 import time
 import traceback
 import logging
@@ -20,13 +20,15 @@ except ImportError:
 
 from google import genai
 from google.genai import types
+import json_utils
 from form_manager import FormManager
-from audio_handler import get_audio_handler
+from audio_handler import AUDIO_HANDLER
 from logging_utils import log_tool_call
 from config import (
     WEBSOCKET_PING_INTERVAL, WEBSOCKET_PING_TIMEOUT, DEFAULT_MODEL,
     LATENCY_MEASUREMENT_INTERVAL, LOG_FILE_LATENCY, LOG_FORMAT,
-    PDF_SYNC_DELAY
+    PDF_SYNC_DELAY, WEBSOCKET_MAX_SIZE, WEBSOCKET_WRITE_LIMIT, WEBSOCKET_COMPRESSION,
+    PDF_TOOL_DECLARATIONS
 )
 
 
@@ -65,13 +67,45 @@ class LatencyLogger:
         self.logger.warning(f"Warning: {message} (client: {client_addr})")
 
 
+# Session config objects depend only on client setup options, so they are built
+# once per distinct option and shared by every connection that asks for it.
+@functools.lru_cache(maxsize=32)
+def _speech_config(voice_name: str) -> types.SpeechConfig:
+    return types.SpeechConfig(
+        voice_config=types.VoiceConfig(
+            prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name=voice_name)
+        ),
+        language_code="en-US",
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _vad_input_config() -> types.RealtimeInputConfig:
+    aad = types.AutomaticActivityDetection(
+        disabled=False,
+        start_of_speech_sensitivity=types.StartSensitivity.START_SENSITIVITY_LOW,
+        end_of_speech_sensitivity=types.EndSensitivity.END_SENSITIVITY_LOW,
+        prefix_padding_ms=20,
+        silence_duration_ms=100,
+    )
+    return types.RealtimeInputConfig(automatic_activity_detection=aad)
+
+
+@functools.lru_cache(maxsize=1)
+def _pdf_form_tool() -> types.Tool:
+    # Validated once; the SDK keeps Tool instances as-is instead of re-parsing the dicts
+    return types.Tool(function_declarations=[
+        types.FunctionDeclaration.model_validate(dict(decl)) for decl in PDF_TOOL_DECLARATIONS
+    ])
+
+
 class SessionConfig:
     """Handles session configuration and setup."""
     
     @staticmethod
     def parse_config_message(config_message: str) -> Dict[str, Any]:
         """Parse and validate configuration message from client."""
-        config_data = json.loads(config_message)
+        config_data = json_utils.loads(config_message)
         config = config_data.get("setup", {})
         
         # Extract and process configuration options
@@ -98,13 +132,7 @@ class SessionConfig:
             return
         
         try:
-            speech_cfg = types.SpeechConfig(
-                voice_config=types.VoiceConfig(
-                    prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name=voice_name)
-                ),
-                language_code="en-US",
-            )
-            config["speech_config"] = speech_cfg
+            config["speech_config"] = _speech_config(voice_name)
         except Exception:
             # Failed to build speech config, continue without it
             pass
@@ -116,19 +144,22 @@ class SessionConfig:
             return
         
         try:
-            aad = types.AutomaticActivityDetection(
-                disabled=False,
-                start_of_speech_sensitivity=types.StartSensitivity.START_SENSITIVITY_LOW,
-                end_of_speech_sensitivity=types.EndSensitivity.END_SENSITIVITY_LOW,
-                prefix_padding_ms=20,
-                silence_duration_ms=100,
-            )
-            config["realtime_input_config"] = types.RealtimeInputConfig(
-                automatic_activity_detection=aad
-            )
+            config["realtime_input_config"] = _vad_input_config()
         except Exception:
             # Failed to build realtime input config, continue without it
             pass
+    
+    @staticmethod
+    def setup_system_instruction(config: Dict[str, Any], form_manager: FormManager):
+        """Pass the form instruction as the session's system instruction."""
+        # Sent in the connect setup rather than as a realtime text turn, so it is a
+        # stable prompt prefix instead of one more user message per session
+        config["system_instruction"] = form_manager.get_system_instruction()
+    
+    @staticmethod
+    def setup_pdf_tools(config: Dict[str, Any]):
+        """Attach the PDF form tool declarations."""
+        config["tools"] = [_pdf_form_tool()]
 
 
 class PDFSyncManager:
@@ -146,6 +177,8 @@ class PDFSyncManager:
     the form session at the moment of a tool call.
     """
 
+    __slots__ = ('form_id', 'full_sync_pending', '_direct_mode', '_session_manager')
+
     def __init__(self, form_id: Optional[str]):
         self.form_id = form_id
         self.full_sync_pending = False
@@ -201,14 +234,14 @@ class PDFSyncManager:
 
     async def _sync_with_aiohttp(self, payload: Dict[str, Any]):
         """Sync using aiohttp if available."""
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=3)) as session:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=3), json_serialize=json_utils.dumps) as session:
             async with session.post("http://localhost:8000/update_form_state", json=payload) as resp:
                 # Silently handle HTTP errors without logging
                 pass
 
     async def _sync_with_urllib(self, payload: Dict[str, Any]):
         """Sync using urllib as fallback."""
-        sync_payload = json.dumps(payload).encode("utf-8")
+        sync_payload = json_utils.dumps_bytes(payload)
         req = urllib.request.Request(
             url="http://localhost:8000/update_form_state",
             data=sync_payload,
@@ -216,7 +249,7 @@ class PDFSyncManager:
             method="POST"
         )
 
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
 
         def _do_sync():
             try:
@@ -251,10 +284,10 @@ async def measure_latency(client_websocket: websockets.ServerProtocol, logger: L
     """Periodically measure and log WebSocket latency."""
     while not client_websocket.closed:
         try:
-            start_time = time.time()
+            start_time = time.monotonic()
             pong_waiter = await client_websocket.ping()
             await pong_waiter
-            latency = time.time() - start_time
+            latency = time.monotonic() - start_time
             latency_ms = latency * 1000
             logger.log_latency(client_addr, latency_ms)
             
@@ -273,12 +306,8 @@ async def measure_latency(client_websocket: websockets.ServerProtocol, logger: L
 
 
 async def setup_session(session, form_manager: FormManager):
-    """Send initial system instruction and priming message."""
+    """Send the priming message (the system instruction goes in the connect config)."""
     try:
-        # Send system instruction
-        system_instruction = form_manager.get_system_instruction()
-        await session.send_realtime_input(text=system_instruction)
-        
         # Send initial message
         initial_message = form_manager.get_initial_message()
         await session.send_realtime_input(text=initial_message)
@@ -286,26 +315,30 @@ async def setup_session(session, form_manager: FormManager):
         # Small delay to ensure messages are processed
         await asyncio.sleep(0.1)
     except Exception:
-        # Failed to send system instruction, continue silently
+        # Failed to send initial message, continue silently
         pass
 
 
 async def handle_realtime_input(data: Dict[str, Any], session, form_manager: FormManager, pdf_sync: PDFSyncManager):
     """Handle realtime input from client."""
     ri = data["realtime_input"]
-    audio_handler = get_audio_handler()
     
     # Handle audio chunks
-    await audio_handler.handle_realtime_audio_input(session, ri)
+    await AUDIO_HANDLER.handle_realtime_audio_input(session, ri)
     
     # Handle text messages
     text_msg = ri.get("text")
     if isinstance(text_msg, str) and text_msg.strip():
-        await audio_handler.handle_text_input(session, text_msg)
+        await AUDIO_HANDLER.handle_text_input(session, text_msg)
     
     # Handle audio stream end
     if ri.get("audio_stream_end") is True:
-        await audio_handler.handle_audio_stream_end(session)
+        await AUDIO_HANDLER.handle_audio_stream_end(session)
+
+
+# Fixed model prompts for the user-edit / confirmation paths
+_ALL_FIELDS_PROVIDED_PROMPT = "All fields now provided. Ask user for final confirmation."
+_FORM_CONFIRMED_PROMPT = "User confirmed all fields. Session will conclude."
 
 
 async def handle_user_edit(data: Dict[str, Any], session, form_manager: FormManager, pdf_sync: PDFSyncManager):
@@ -318,13 +351,12 @@ async def handle_user_edit(data: Dict[str, Any], session, form_manager: FormMana
         return
     
     if field in form_manager.form_state.state:
-        form_manager.form_state.state[field] = str(value)[:500]
-        form_manager.form_state.confirmed[field] = True
+        form_manager.form_state.set_field(field, str(value)[:500])
         
-        missing = form_manager.get_missing_fields()
+        # O(1) completeness check; the missing-field list itself is not needed here
         msg = (
-            f"User explicitly set {field} = {value}. Ask only for the next missing field."
-            if missing else "All fields now provided. Ask user for final confirmation."
+            _ALL_FIELDS_PROVIDED_PROMPT if form_manager.form_state.is_complete()
+            else f"User explicitly set {field} = {value}. Ask only for the next missing field."
         )
         
         try:
@@ -344,31 +376,34 @@ async def handle_form_confirmation(data: Dict[str, Any], session, form_manager:
     if "confirm_form" not in data:
         return
     
+    form_state = form_manager.form_state
+    
     # Mark session as download confirmed regardless of completeness
-    if form_manager.form_state:
+    if form_state:
+        # Record it on the live form state too (all_confirmed was never set before)
+        form_state.all_confirmed = True
         # Use the same session manager instance as the HTTP server
         import server
-        form_id = form_manager.form_state.form_id
-        server.session_manager.confirm_session_download(form_id)
+        server.session_manager.confirm_session_download(form_state.form_id)
     
     # Final full sync before signaling readiness
     try:
-        if form_manager.form_state:
-            filled_state = {k: v for k, v in form_manager.form_state.state.items() if v}
+        if form_state:
+            filled_state = {k: v for k, v in form_state.state.items() if v}
             await pdf_sync.sync_updates(filled_state)
     except Exception:
         # Final sync error, continue silently
         pass
     
     try:
-        await session.send_realtime_input(text="User confirmed all fields. Session will conclude.")
+        await session.send_realtime_input(text=_FORM_CONFIRMED_PROMPT)
     except Exception:
         pass
     
-    # Notify UI to enable download
+    # Notify UI to enable download (through the session writer when given, so it stays behind queued notifications)
     try:
-        form_id = getattr(form_manager.form_state, 'form_id', None)
-        await client_websocket.send(json.dumps({"download_ready": True, "form_id": form_id}))
+        form_id = getattr(form_state, 'form_id', None)
+        await client_websocket.send(json_utils.dumps({"download_ready": True, "form_id": form_id}))
     except Exception:
         # Failed to send download_ready message
         pass
@@ -387,7 +422,10 @@ def create_websocket_server():
         "localhost",
         9082,
         ping_interval=WEBSOCKET_PING_INTERVAL,
-        ping_timeout=WEBSOCKET_PING_TIMEOUT
+        ping_timeout=WEBSOCKET_PING_TIMEOUT,
+        compression=WEBSOCKET_COMPRESSION,
+        max_size=WEBSOCKET_MAX_SIZE,
+        write_limit=WEBSOCKET_WRITE_LIMIT
     )
 
 